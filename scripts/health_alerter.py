@@ -1,20 +1,36 @@
 """Consecutive failure alerting with notification history for health monitoring."""
 
+from __future__ import annotations
+
+import inspect
 import logging
+import os
+import threading
 import time
+from array import array
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Optional, Protocol, runtime_checkable
 
-import httpx
-
 from health_checker import HealthResult, HealthStatus
+from health_http import CircuitBreaker
+from health_imports import lazy_import
+from health_metrics import HealthMetrics
+
+asyncio = lazy_import("asyncio")
+httpx = lazy_import("httpx")
 
 logger = logging.getLogger("health_alerter")
 
+COALESCE_WINDOW = float(os.getenv("HEALTH_COALESCE_WINDOW", "5"))
+CHANNEL_TIMEOUT = float(os.getenv("HEALTH_ALERT_CHANNEL_TIMEOUT", "15"))
+ALERT_THRESHOLD = int(os.getenv("HEALTH_ALERT_THRESHOLD", "3"))
+ALERT_WEBHOOK_URL = os.getenv("HEALTH_ALERT_WEBHOOK_URL", "")
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class Alert:
     service_name: str
     consecutive_failures: int
@@ -29,11 +45,77 @@ class AlertChannel(Protocol):
     def send(self, alert: Alert) -> None: ...
 
 
+@runtime_checkable
+class AsyncAlertChannel(Protocol):
+    async def send(self, alert: Alert) -> None: ...
+
+
+def is_async_channel(channel: object) -> bool:
+    return inspect.iscoroutinefunction(getattr(channel, "send", None))
+
+
+class SyncChannelAdapter:
+    """Runs a blocking :class:`AlertChannel` in an executor so it can be awaited."""
+
+    def __init__(self, channel: AlertChannel, executor: Optional[ThreadPoolExecutor] = None):
+        self.channel = channel
+        self.executor = executor
+
+    async def send(self, alert: Alert) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self.channel.send, alert)
+
+
+class _LoopThread:
+    """One event loop on a daemon thread that sync callers run async channels on.
+
+    A pooled AsyncClient is bound to the loop it first ran on, so a fresh
+    ``asyncio.run`` per alert would break it from the second alert on.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def run(self, coro):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="alert-channel-loop", daemon=True
+                ).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+
+_CHANNEL_LOOP = _LoopThread()
+
+
+def _call_channel(method, *args) -> None:
+    """Call a channel's ``send``/``send_batch``, running it to completion if async."""
+    if inspect.iscoroutinefunction(method):
+        _CHANNEL_LOOP.run(method(*args))
+    else:
+        method(*args)
+
+
+def as_async_channel(
+    channel: object, executor: Optional[ThreadPoolExecutor] = None
+) -> AsyncAlertChannel:
+    if is_async_channel(channel):
+        return channel
+    return SyncChannelAdapter(channel, executor)
+
+
 class ConsecutiveFailureTracker:
     def __init__(self, threshold: int = 3):
         self.threshold = threshold
         self._counts: dict[str, int] = {}
 
+    def seed(self, counts: dict[str, int]) -> None:
+        """Restore failure streaks, e.g. from HealthStorage.get_failure_streaks()."""
+        for service, count in counts.items():
+            self._counts[service] = count
+
     def record(self, result: HealthResult) -> bool:
         service = result.service_name
         if result.status == HealthStatus.HEALTHY:
@@ -65,14 +147,37 @@ class ConsoleAlertChannel:
 
 
 class WebhookAlertChannel:
-    def __init__(self, url: str, timeout: float = 10.0, max_retries: int = 3):
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        client: Optional[httpx.Client] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
         self.url = url
         self.timeout = timeout
         self.max_retries = max_retries
+        self.client = client
+        self.breaker = breaker
         self._retry_backoff = [1, 2, 4][:max_retries]
 
     def send(self, alert: Alert) -> None:
-        payload = {
+        self._deliver(self._payload(alert))
+
+    def send_batch(self, alerts: list[Alert]) -> None:
+        if len(alerts) == 1:
+            self.send(alerts[0])
+            return
+        self._deliver({
+            "event": "consecutive_failure_alert_batch",
+            "alerts": [self._payload(alert) for alert in alerts],
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        })
+
+    @staticmethod
+    def _payload(alert: Alert) -> dict:
+        return {
             "event": "consecutive_failure_alert",
             "service": alert.service_name,
             "consecutive_failures": alert.consecutive_failures,
@@ -84,40 +189,269 @@ class WebhookAlertChannel:
             "timestamp": alert.timestamp.isoformat(),
         }
 
+    def _deliver(self, payload: dict) -> None:
         for attempt, backoff in enumerate(self._retry_backoff):
+            if self.breaker is not None and not self.breaker.allow_request():
+                logger.warning("Circuit open for %s, dropping alert", self.url)
+                return
             try:
-                with httpx.Client(timeout=self.timeout) as client:
-                    resp = client.post(self.url, json=payload)
-                    if resp.status_code < 400:
-                        return
-                    if resp.status_code in (400, 401, 403, 404):
-                        return
+                resp = self._post(payload)
+                if resp.status_code < 400 or resp.status_code in (400, 401, 403, 404):
+                    if self.breaker is not None:
+                        self.breaker.record_success()
+                    return
             except httpx.RequestError:
                 pass
+            except Exception:
+                # Release a half-open trial before letting an unexpected error out.
+                if self.breaker is not None:
+                    self.breaker.record_failure()
+                raise
+            if self.breaker is not None:
+                self.breaker.record_failure()
+                if self.breaker.state != CircuitBreaker.CLOSED:
+                    return
 
             if attempt < len(self._retry_backoff) - 1:
                 time.sleep(backoff)
 
+    def _post(self, payload: dict) -> httpx.Response:
+        if self.client is not None:
+            return self.client.post(self.url, json=payload, timeout=self.timeout)
+        with httpx.Client(timeout=self.timeout) as client:
+            return client.post(self.url, json=payload)
+
+
+class AsyncWebhookAlertChannel:
+    """Non-blocking counterpart of :class:`WebhookAlertChannel`.
+
+    Backs off with ``asyncio.sleep`` so retries never hold up the event loop.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        client: Optional[httpx.AsyncClient] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.client = client
+        self.breaker = breaker
+        self._retry_backoff = [1, 2, 4][:max_retries]
+
+    async def send(self, alert: Alert) -> None:
+        await self._deliver(WebhookAlertChannel._payload(alert))
+
+    async def send_batch(self, alerts: list[Alert]) -> None:
+        if len(alerts) == 1:
+            await self.send(alerts[0])
+            return
+        await self._deliver({
+            "event": "consecutive_failure_alert_batch",
+            "alerts": [WebhookAlertChannel._payload(alert) for alert in alerts],
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        })
+
+    async def _deliver(self, payload: dict) -> None:
+        for attempt, backoff in enumerate(self._retry_backoff):
+            if self.breaker is not None and not self.breaker.allow_request():
+                logger.warning("Circuit open for %s, dropping alert", self.url)
+                return
+            try:
+                resp = await self._post(payload)
+                if resp.status_code < 400 or resp.status_code in (400, 401, 403, 404):
+                    if self.breaker is not None:
+                        self.breaker.record_success()
+                    return
+            except httpx.RequestError:
+                pass
+            except Exception:
+                # Release a half-open trial before letting an unexpected error out.
+                if self.breaker is not None:
+                    self.breaker.record_failure()
+                raise
+            if self.breaker is not None:
+                self.breaker.record_failure()
+                if self.breaker.state != CircuitBreaker.CLOSED:
+                    return
+
+            if attempt < len(self._retry_backoff) - 1:
+                await asyncio.sleep(backoff)
+
+    async def _post(self, payload: dict) -> httpx.Response:
+        if self.client is not None:
+            return await self.client.post(self.url, json=payload, timeout=self.timeout)
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            return await client.post(self.url, json=payload)
+
+
+class CoalescingAlertChannel:
+    """Buffers alerts for ``window`` seconds and hands them on as one batch.
+
+    The wrapped channel receives ``send_batch(alerts)`` if it has one, otherwise
+    one ``send`` per alert; the flushing thread waits for async channels on
+    the shared channel loop. Correlated failures (e.g. the database taking its dependants down)
+    then cost one request per channel instead of one each.
+    """
+
+    def __init__(self, channel: AlertChannel, window: float = COALESCE_WINDOW):
+        self.channel = channel
+        self.window = window
+        self._pending: list[Alert] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def send(self, alert: Alert) -> None:
+        with self._lock:
+            self._pending.append(alert)
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            alerts, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not alerts:
+            return
+
+        try:
+            send_batch = getattr(self.channel, "send_batch", None)
+            if send_batch is not None:
+                _call_channel(send_batch, alerts)
+            else:
+                for alert in alerts:
+                    _call_channel(self.channel.send, alert)
+        except Exception:
+            logger.exception("Channel %s failed to send alert batch", type(self.channel).__name__)
+
+
+class _AlertRing:
+    """Fixed-size ring of Alert objects addressed by slot."""
+
+    def __init__(self, size: int):
+        self._items: list[Optional[Alert]] = [None] * size
+
+    def put(self, slot: int, alert: Alert) -> None:
+        self._items[slot] = alert
+
+    def get(self, slot: int) -> Alert:
+        return self._items[slot]
+
+    def service_name(self, slot: int) -> str:
+        return self._items[slot].service_name
+
+
+class _CompactAlertRing:
+    """Struct-of-arrays ring: one typed array per field, Alerts built on read.
+
+    Service names are interned to small integer IDs and statuses stored as
+    codes; details are not kept. A slot costs about 25 bytes instead of a
+    full Alert with its datetime and details dict.
+    """
+
+    _STATUSES = list(HealthStatus)
+    _STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+
+    def __init__(self, size: int):
+        self._service_ids = array("I", bytes(4 * size))
+        self._status_codes = array("B", bytes(size))
+        self._failures = array("I", bytes(4 * size))
+        self._thresholds = array("I", bytes(4 * size))
+        self._timestamps = array("d", bytes(8 * size))
+        self._names: list[str] = []
+        self._name_ids: dict[str, int] = {}
+
+    def put(self, slot: int, alert: Alert) -> None:
+        service_id = self._name_ids.get(alert.service_name)
+        if service_id is None:
+            service_id = self._name_ids[alert.service_name] = len(self._names)
+            self._names.append(alert.service_name)
+        self._service_ids[slot] = service_id
+        self._status_codes[slot] = self._STATUS_CODES[HealthStatus(alert.latest_status)]
+        self._failures[slot] = alert.consecutive_failures
+        self._thresholds[slot] = alert.threshold
+        self._timestamps[slot] = alert.timestamp.timestamp()
+
+    def get(self, slot: int) -> Alert:
+        return Alert(
+            service_name=self._names[self._service_ids[slot]],
+            consecutive_failures=self._failures[slot],
+            threshold=self._thresholds[slot],
+            latest_status=self._STATUSES[self._status_codes[slot]],
+            timestamp=datetime.fromtimestamp(self._timestamps[slot], timezone.utc),
+        )
+
+    def service_name(self, slot: int) -> str:
+        return self._names[self._service_ids[slot]]
+
 
 class NotificationHistory:
-    def __init__(self, max_size: int = 1000):
-        self._records: deque[Alert] = deque(maxlen=max_size)
+    """Bounded alert history with per-service and failure indexes.
+
+    Alerts live in a ring buffer addressed by sequence number; the indexes are
+    FIFO deques of sequence numbers, so the alert overwritten by a new one is
+    always the oldest entry of its indexes and can be dropped with a popleft.
+    Queries cost O(result) rather than O(max_size).
+
+    With ``compact=True`` alerts are kept field by field in typed arrays and
+    rebuilt on read, without their details, for a fraction of the memory.
+    """
+
+    def __init__(self, max_size: int = 1000, compact: bool = False):
+        self.max_size = max_size
+        self.compact = compact
+        self._ring = _CompactAlertRing(max_size) if compact else _AlertRing(max_size)
+        self._by_service: dict[str, deque[int]] = {}
+        self._failures: deque[int] = deque()
         self._total: int = 0
+        self._lock = threading.Lock()
 
     def record(self, alert: Alert) -> None:
-        self._records.append(alert)
-        self._total += 1
+        with self._lock:
+            seq = self._total
+            self._total += 1
+            if self.max_size <= 0:
+                return
+            if seq >= self.max_size:
+                self._evict(seq - self.max_size)
+            self._ring.put(seq % self.max_size, alert)
+            self._by_service.setdefault(alert.service_name, deque()).append(seq)
+            if alert.latest_status != HealthStatus.HEALTHY:
+                self._failures.append(seq)
+
+    def _evict(self, seq: int) -> None:
+        name = self._ring.service_name(seq % self.max_size)
+        service = self._by_service[name]
+        service.popleft()
+        if not service:
+            del self._by_service[name]
+        if self._failures and self._failures[0] == seq:
+            self._failures.popleft()
+
+    def _get(self, seq: int) -> Alert:
+        return self._ring.get(seq % self.max_size)
 
     def get_recent(self, n: int = 50) -> list[Alert]:
-        items = list(self._records)
-        items.reverse()
-        return items[:n]
+        with self._lock:
+            stored = min(self._total, max(self.max_size, 0))
+            newest = self._total - 1
+            return [self._get(seq) for seq in range(newest, newest - min(n, stored), -1)]
 
     def get_for_service(self, service_name: str) -> list[Alert]:
-        return [a for a in self._records if a.service_name == service_name]
+        with self._lock:
+            return [self._get(seq) for seq in self._by_service.get(service_name, ())]
 
     def get_failures(self) -> list[Alert]:
-        return [a for a in self._records if a.latest_status != HealthStatus.HEALTHY]
+        with self._lock:
+            return [self._get(seq) for seq in self._failures]
 
     def total_count(self) -> int:
         return self._total
@@ -129,17 +463,98 @@ class HealthAlerter:
         channels: list[AlertChannel],
         threshold: int = 3,
         history_max_size: int = 1000,
+        coalesce_window: float = 0.0,
+        channel_timeout: float = CHANNEL_TIMEOUT,
+        compact_history: bool = False,
+        metrics: Optional[HealthMetrics] = None,
     ):
         self.tracker = ConsecutiveFailureTracker(threshold=threshold)
+        if coalesce_window > 0:
+            channels = [CoalescingAlertChannel(c, coalesce_window) for c in channels]
         self.channels = channels
-        self.history = NotificationHistory(max_size=history_max_size)
-
-    def process_result(self, result: HealthResult) -> Optional[Alert]:
+        self.channel_timeout = channel_timeout
+        self.history = NotificationHistory(max_size=history_max_size, compact=compact_history)
+        self.metrics = metrics
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._async_channels: Optional[list[AsyncAlertChannel]] = None
+
+    def flush(self) -> None:
+        """Send any alerts still held in a coalescing window."""
+        for channel in self.channels:
+            if isinstance(channel, CoalescingAlertChannel):
+                channel.flush()
+
+    def close(self) -> None:
+        """Flush pending alerts and release the dispatch threads."""
+        self.flush()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(4, 2 * len(self.channels)), thread_name_prefix="alert-channel"
+            )
+        return self._executor
+
+    def _dispatch(self, alert: Alert) -> None:
+        """Send to every channel concurrently, waiting at most ``channel_timeout``.
+
+        A channel that raises or overruns is logged and does not hold up the
+        others; an overrunning send keeps going in the background.
+        """
+        if not self.channels:
+            return
+        executor = self._get_executor()
+        futures = {
+            executor.submit(self._send, channel, alert): channel
+            for channel in self.channels
+        }
+        _, pending = wait(futures, timeout=self.channel_timeout)
+        for future in pending:
+            logger.warning(
+                "Channel %s did not finish within %ss",
+                type(futures[future]).__name__,
+                self.channel_timeout,
+            )
+
+    async def _dispatch_async(self, alert: Alert) -> None:
+        """Await every channel concurrently, each bounded by ``channel_timeout``.
+
+        Sync channels run on the dispatch executor so they never block the loop.
+        """
+        if not self.channels:
+            return
+        if self._async_channels is None:
+            executor = self._get_executor()
+            self._async_channels = [as_async_channel(c, executor) for c in self.channels]
+        await asyncio.gather(*(self._send_async(c, alert) for c in self._async_channels))
+
+    async def _send_async(self, channel: AsyncAlertChannel, alert: Alert) -> None:
+        name = type(getattr(channel, "channel", channel)).__name__
+        try:
+            await asyncio.wait_for(channel.send(alert), timeout=self.channel_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Channel %s did not finish within %ss", name, self.channel_timeout)
+        except Exception:
+            logger.exception("Channel %s failed to send alert", name)
+
+    @staticmethod
+    def _send(channel: AlertChannel, alert: Alert) -> None:
+        try:
+            _call_channel(channel.send, alert)
+        except Exception:
+            logger.exception("Channel %s failed to send alert", type(channel).__name__)
+
+    def _build_alert(self, result: HealthResult) -> Optional[Alert]:
         should_alert = self.tracker.record(result)
         if not should_alert:
             return None
 
-        alert = Alert(
+        if self.metrics is not None:
+            self.metrics.observe_alert(result.service_name)
+        return Alert(
             service_name=result.service_name,
             consecutive_failures=self.tracker.get_count(result.service_name),
             threshold=self.tracker.threshold,
@@ -147,11 +562,21 @@ class HealthAlerter:
             latest_details=result.details,
         )
 
-        for channel in self.channels:
-            try:
-                channel.send(alert)
-            except Exception:
-                logger.exception("Channel %s failed to send alert", type(channel).__name__)
+    def process_result(self, result: HealthResult) -> Optional[Alert]:
+        alert = self._build_alert(result)
+        if alert is None:
+            return None
+
+        self._dispatch(alert)
+        self.history.record(alert)
+        return alert
+
+    async def process_result_async(self, result: HealthResult) -> Optional[Alert]:
+        """Event-loop variant of :meth:`process_result`."""
+        alert = self._build_alert(result)
+        if alert is None:
+            return None
 
+        await self._dispatch_async(alert)
         self.history.record(alert)
         return alert
@@ -0,0 +1,263 @@
+"""Local query API served by the resident monitor over a Unix socket or loopback TCP."""
+
+import http.client
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from health_checker import HealthResult
+from health_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from health_metrics import HealthMetrics
+
+API_SOCKET = os.getenv("HEALTH_API_SOCKET", "")
+API_HOST = os.getenv("HEALTH_API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("HEALTH_API_PORT") or 0)
+API_TIMEOUT = 1.0
+# Uptime is read from storage at most once per this many seconds.
+UPTIME_CACHE_TTL = 60.0
+TRANSITIONS_KEPT = 100
+DEFAULT_LIMIT = 50
+
+
+class LatestResults:
+    """Newest result per service, kept in memory by the monitor loop."""
+
+    def __init__(self):
+        self._results: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def update(self, results: Iterable[HealthResult]):
+        now = time.time()
+        with self._lock:
+            for result in results:
+                self._results[result.service_name] = {
+                    "service": result.service_name,
+                    "status": result.status.value,
+                    "response_time_ms": result.response_time_ms,
+                    "details": result.details,
+                    "checked_at": now,
+                }
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            return list(self._results.values())
+
+
+class MonitorState:
+    """Everything the API serves, updated by the monitor loop as it runs.
+
+    Latest results and recent transitions are pushed in by the loop; the
+    alert tail is read from the alerter's NotificationHistory; uptime comes
+    from ``uptime`` (typically HealthStorage.get_uptime_stats) through a
+    short-lived cache, so request rate never turns into database load.
+    ``metrics`` is rendered as-is for /metrics.
+    """
+
+    def __init__(
+        self,
+        history=None,
+        uptime: Optional[Callable[[int], dict]] = None,
+        statuses: Optional[dict[str, str]] = None,
+        transitions: Iterable[dict] = (),
+        uptime_ttl: float = UPTIME_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+        metrics: Optional[HealthMetrics] = None,
+    ):
+        self.latest = LatestResults()
+        self.metrics = metrics
+        self.history = history
+        self._uptime = uptime
+        self._uptime_ttl = uptime_ttl
+        self._uptime_cache: dict[int, tuple[float, dict]] = {}
+        self._clock = clock
+        self._statuses = dict(statuses or {})
+        # Seeded newest first (as storage returns them), kept oldest first.
+        self._transitions: deque[dict] = deque(reversed(list(transitions)), maxlen=TRANSITIONS_KEPT)
+        self._lock = threading.Lock()
+
+    def record(self, results: list[HealthResult], transition_ids: Iterable[Optional[int]]):
+        """Take in one batch of results and the transition IDs storage gave them."""
+        self.latest.update(results)
+        now = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        with self._lock:
+            for result, transition_id in zip(results, transition_ids):
+                status = result.status.value
+                previous = self._statuses.get(result.service_name)
+                self._statuses[result.service_name] = status
+                if transition_id:
+                    self._transitions.append({
+                        "id": transition_id,
+                        "service_name": result.service_name,
+                        "from_status": previous,
+                        "to_status": status,
+                        "transitioned_at": now,
+                    })
+
+    def render_metrics(self, query: dict) -> str:
+        return self.metrics.render() if self.metrics is not None else "# EOF\n"
+
+    def status(self, query: dict) -> list[dict]:
+        return self.latest.snapshot()
+
+    def transitions(self, query: dict) -> list[dict]:
+        limit = _int_param(query, "limit", DEFAULT_LIMIT)
+        with self._lock:
+            return list(reversed(self._transitions))[:limit]
+
+    def alerts(self, query: dict) -> list[dict]:
+        if self.history is None:
+            return []
+        return [
+            {
+                "service": alert.service_name,
+                "consecutive_failures": alert.consecutive_failures,
+                "threshold": alert.threshold,
+                "status": alert.latest_status.value,
+                "timestamp": alert.timestamp.isoformat(),
+            }
+            for alert in self.history.get_recent(_int_param(query, "limit", DEFAULT_LIMIT))
+        ]
+
+    def uptime(self, query: dict) -> dict:
+        if self._uptime is None:
+            return {}
+        days = _int_param(query, "days", 7)
+        now = self._clock()
+        with self._lock:
+            cached = self._uptime_cache.get(days)
+            if cached is not None and now - cached[0] < self._uptime_ttl:
+                return cached[1]
+        stats = self._uptime(days)
+        with self._lock:
+            self._uptime_cache[days] = (now, stats)
+        return stats
+
+
+def _int_param(query: dict, name: str, default: int) -> int:
+    try:
+        return max(0, int(query[name][0]))
+    except (KeyError, IndexError, ValueError):
+        return default
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_APIServer"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        route = self.server.routes.get(url.path)
+        if route is None:
+            self._send_json(404, {"error": f"Unknown path {url.path}"})
+            return
+        body = route(parse_qs(url.query))
+        if isinstance(body, str):
+            self._send(200, body.encode(), METRICS_CONTENT_TYPE)
+        else:
+            self._send_json(200, body)
+
+    def _send_json(self, code: int, body) -> None:
+        self._send(code, json.dumps(body).encode(), "application/json")
+
+    def _send(self, code: int, payload: bytes, content_type: str) -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _APIServer(socketserver.ThreadingMixIn):
+    """Routes and background-thread lifecycle shared by both transports."""
+
+    daemon_threads = True
+
+    def _init_routes(self, state: MonitorState):
+        self.state = state
+        self.routes = {
+            "/status": state.status,
+            "/transitions": state.transitions,
+            "/alerts": state.alerts,
+            "/uptime": state.uptime,
+            "/metrics": state.render_metrics,
+        }
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="health-api", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def close(self):
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+
+class HealthAPIServer(_APIServer, socketserver.UnixStreamServer):
+    """Serves the API on a Unix socket; :meth:`close` also removes the socket."""
+
+    def __init__(self, socket_path: str, state: MonitorState):
+        self.socket_path = socket_path
+        self._init_routes(state)
+        path = Path(socket_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            path.unlink()
+        super().__init__(socket_path, _Handler)
+
+    def close(self):
+        super().close()
+        Path(self.socket_path).unlink(missing_ok=True)
+
+
+class HealthAPITCPServer(_APIServer, socketserver.TCPServer):
+    """Serves the API over HTTP on ``host:port``, loopback by default."""
+
+    allow_reuse_address = True
+
+    def __init__(self, port: int, state: MonitorState, host: str = API_HOST):
+        self._init_routes(state)
+        super().__init__((host, port), _Handler)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def fetch_json(socket_path: str, path: str, timeout: float = API_TIMEOUT):
+    """GET ``path`` from the monitor's API. Returns None if it cannot be reached."""
+    conn = _UnixHTTPConnection(socket_path, timeout)
+    try:
+        conn.request("GET", path)
+        resp = conn.getresponse()
+        # Read the body even on errors so the server's write is not cut off.
+        body = resp.read()
+        if resp.status != 200:
+            return None
+        return json.loads(body)
+    except (OSError, http.client.HTTPException, ValueError):
+        return None
+    finally:
+        conn.close()
@@ -1,11 +1,20 @@
 """Docker service health checker for the Postiz stack."""
 
+import os
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
 
-import docker
+from health_imports import lazy_import
+
+docker = lazy_import("docker")
+
+if TYPE_CHECKING:
+    from health_metrics import HealthMetrics
 
 
 class HealthStatus(Enum):
@@ -14,7 +23,7 @@ class HealthStatus(Enum):
     MISSING = "missing"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class HealthResult:
     service_name: str
     status: HealthStatus
@@ -32,22 +41,258 @@ SERVICE_CONTAINERS = {
     "temporal-ui": "postiz-temporal-ui",
 }
 
+CHECK_WORKERS = int(os.getenv("HEALTH_CHECK_WORKERS", "1"))
+CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "10"))
+CHECK_BULK = os.getenv("HEALTH_CHECK_BULK", "false").lower() in ("1", "true", "yes")
+
+# Container events that can change a service's health
+EVENT_ACTIONS = ("health_status", "die", "start", "oom")
+
+# `docker ps` style status, e.g. "Up 5 minutes (healthy)" or "Up 3 seconds (health: starting)"
+_LIST_HEALTH_RE = re.compile(r"\((healthy|unhealthy|health: starting)\)")
+
 
 class HealthChecker:
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: int = CHECK_WORKERS,
+        timeout: float = CHECK_TIMEOUT,
+        bulk: bool = CHECK_BULK,
+        metrics: Optional["HealthMetrics"] = None,
+    ):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.bulk = bulk
+        self.metrics = metrics
         try:
             self.client = docker.from_env()
             self.client.ping()
         except docker.errors.DockerException as e:
             raise RuntimeError(f"Cannot connect to Docker daemon: {e}")
 
-    def check_all_services(self) -> list[HealthResult]:
+    def check_all_services(self, services: Optional[dict[str, str]] = None) -> list[HealthResult]:
+        start = time.perf_counter()
+        results = self._check_all(SERVICE_CONTAINERS if services is None else services)
+        if self.metrics is not None:
+            self.metrics.observe_sweep(time.perf_counter() - start)
+        return results
+
+    def _check_all(self, services: dict[str, str]) -> list[HealthResult]:
+        if self.bulk:
+            return self.check_all_services_bulk(services)
+        if self.max_workers > 1:
+            return self.check_all_services_concurrent(services)
+
         results = []
-        for service_name, container_name in SERVICE_CONTAINERS.items():
+        for service_name, container_name in services.items():
             result = self.check_service(service_name, container_name)
             results.append(result)
         return results
 
+    def check_services(self, service_names: Iterable[str]) -> list[HealthResult]:
+        """Check a subset of SERVICE_CONTAINERS, in the order given."""
+        return self.check_all_services(
+            {name: SERVICE_CONTAINERS[name] for name in service_names}
+        )
+
+    def check_all_services_concurrent(
+        self, services: Optional[dict[str, str]] = None
+    ) -> list[HealthResult]:
+        """Probe all services on a bounded worker pool, in SERVICE_CONTAINERS order.
+
+        Services that do not answer within ``self.timeout`` seconds of the sweep
+        start are reported as unhealthy; their probe is abandoned, not awaited.
+        """
+        services = SERVICE_CONTAINERS if services is None else services
+        workers = max(1, min(self.max_workers, len(services)))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="health-check")
+        try:
+            start = time.perf_counter()
+            futures = {
+                service_name: executor.submit(self.check_service, service_name, container_name)
+                for service_name, container_name in services.items()
+            }
+
+            results = []
+            for service_name, future in futures.items():
+                remaining = self.timeout - (time.perf_counter() - start)
+                try:
+                    results.append(future.result(timeout=max(remaining, 0)))
+                except FutureTimeoutError:
+                    future.cancel()
+                    results.append(
+                        HealthResult(
+                            service_name=service_name,
+                            status=HealthStatus.UNHEALTHY,
+                            response_time_ms=int((time.perf_counter() - start) * 1000),
+                            details={"error": f"Health check timed out after {self.timeout}s"},
+                        )
+                    )
+                except Exception as e:
+                    results.append(
+                        HealthResult(
+                            service_name=service_name,
+                            status=HealthStatus.UNHEALTHY,
+                            response_time_ms=int((time.perf_counter() - start) * 1000),
+                            details={"error": f"Health check failed: {e}"},
+                        )
+                    )
+            return results
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def check_all_services_bulk(
+        self, services: Optional[dict[str, str]] = None
+    ) -> list[HealthResult]:
+        """Check all services from a single container listing.
+
+        Status and health come from one ``/containers/json`` call; only
+        containers reporting ``unhealthy`` are inspected individually, to read
+        the last health check output.
+        """
+        services = SERVICE_CONTAINERS if services is None else services
+        start = time.perf_counter()
+        names = list(services.values())
+
+        try:
+            listing = self.client.api.containers(all=True, filters={"name": names})
+        except docker.errors.APIError as e:
+            elapsed_ms = int((time.perf_counter() - start) * 1000)
+            return [
+                HealthResult(
+                    service_name=service_name,
+                    status=HealthStatus.UNHEALTHY,
+                    response_time_ms=elapsed_ms,
+                    details={"error": f"Docker API error: {e}"},
+                )
+                for service_name in services
+            ]
+
+        # The name filter is a substring match, so index on exact names.
+        by_name = {}
+        for entry in listing:
+            for name in entry.get("Names") or []:
+                by_name[name.lstrip("/")] = entry
+
+        elapsed_ms = int((time.perf_counter() - start) * 1000)
+        results = []
+        for service_name, container_name in services.items():
+            entry = by_name.get(container_name)
+            if entry is None:
+                results.append(
+                    HealthResult(
+                        service_name=service_name,
+                        status=HealthStatus.MISSING,
+                        response_time_ms=elapsed_ms,
+                        details={"error": f"Container {container_name} not found"},
+                    )
+                )
+                continue
+
+            state = entry.get("State", "")
+            if state != "running":
+                results.append(
+                    HealthResult(
+                        service_name=service_name,
+                        status=HealthStatus.UNHEALTHY,
+                        response_time_ms=elapsed_ms,
+                        details={"error": f"Container not running: {state}"},
+                    )
+                )
+                continue
+
+            match = _LIST_HEALTH_RE.search(entry.get("Status", ""))
+            health_status = match.group(1) if match else None
+
+            if health_status == "unhealthy":
+                results.append(self.check_service(service_name, container_name))
+            elif health_status == "healthy":
+                results.append(
+                    HealthResult(
+                        service_name=service_name,
+                        status=HealthStatus.HEALTHY,
+                        response_time_ms=elapsed_ms,
+                        details={"docker_health": health_status},
+                    )
+                )
+            else:
+                results.append(
+                    HealthResult(
+                        service_name=service_name,
+                        status=HealthStatus.HEALTHY,
+                        response_time_ms=elapsed_ms,
+                        details={"docker_health": "none", "container_status": "running"},
+                    )
+                )
+        return results
+
+    def watch_events(
+        self, since: Optional[int] = None, until: Optional[int] = None
+    ) -> Iterator[HealthResult]:
+        """Yield a HealthResult for each health-relevant container event.
+
+        Blocks on the Docker events stream; the stream ends at ``until`` (epoch
+        seconds), or never if it is None.
+        """
+        events = self.client.events(
+            since=since,
+            until=until,
+            decode=True,
+            filters={
+                "type": "container",
+                "container": list(SERVICE_CONTAINERS.values()),
+                "event": list(EVENT_ACTIONS),
+            },
+        )
+        for event in events:
+            result = self.result_from_event(event)
+            if result is not None:
+                yield result
+
+    def result_from_event(self, event: dict) -> Optional[HealthResult]:
+        """Translate a Docker container event into a HealthResult.
+
+        Returns None for events about containers outside SERVICE_CONTAINERS.
+        Events that do not carry enough state (``start``, ``unhealthy``) are
+        resolved with a single inspect of that container.
+        """
+        attributes = event.get("Actor", {}).get("Attributes", {})
+        container_name = attributes.get("name", "")
+        service_name = next(
+            (s for s, c in SERVICE_CONTAINERS.items() if c == container_name), None
+        )
+        if service_name is None:
+            return None
+
+        action = event.get("Action", event.get("status", ""))
+
+        if action == "health_status: healthy":
+            return HealthResult(
+                service_name=service_name,
+                status=HealthStatus.HEALTHY,
+                response_time_ms=0,
+                details={"docker_health": "healthy", "event": action},
+            )
+        if action == "die":
+            return HealthResult(
+                service_name=service_name,
+                status=HealthStatus.UNHEALTHY,
+                response_time_ms=0,
+                details={
+                    "error": f"Container died (exit code {attributes.get('exitCode', '?')})",
+                    "event": action,
+                },
+            )
+        if action == "oom":
+            return HealthResult(
+                service_name=service_name,
+                status=HealthStatus.UNHEALTHY,
+                response_time_ms=0,
+                details={"error": "Container ran out of memory", "event": action},
+            )
+
+        return self.check_service(service_name, container_name)
+
     def check_service(self, service_name: str, container_name: str) -> HealthResult:
         start = time.perf_counter()
 
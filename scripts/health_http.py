@@ -0,0 +1,177 @@
+"""Shared, pooled HTTP client and circuit breaker for webhook delivery."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from health_imports import lazy_import
+
+httpx = lazy_import("httpx")
+
+HTTP_TIMEOUT = 10.0
+HTTP_MAX_CONNECTIONS = int(os.getenv("HEALTH_HTTP_MAX_CONNECTIONS", "10"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HEALTH_HTTP_MAX_KEEPALIVE", "5"))
+HTTP_KEEPALIVE_EXPIRY = 30.0
+
+BREAKER_FAILURE_RATE = float(os.getenv("HEALTH_BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_WINDOW = int(os.getenv("HEALTH_BREAKER_WINDOW", "10"))
+BREAKER_MIN_CALLS = 3
+BREAKER_COOLDOWN = float(os.getenv("HEALTH_BREAKER_COOLDOWN", "30"))
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional ``h2`` package (``pip install httpx[http2]``)."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client(
+    timeout: float = HTTP_TIMEOUT,
+    max_connections: int = HTTP_MAX_CONNECTIONS,
+    max_keepalive: int = HTTP_MAX_KEEPALIVE,
+    http2: Optional[bool] = None,
+) -> httpx.Client:
+    """Create a keep-alive client to share between all webhook senders.
+
+    Reusing one client keeps TCP/TLS connections to the receiver open across
+    notifications. HTTP/2 is enabled when available unless ``http2`` says
+    otherwise. The caller owns the client and must close it on shutdown.
+    """
+    if http2 is None:
+        http2 = http2_available()
+    return httpx.Client(
+        timeout=timeout,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def create_async_http_client(
+    timeout: float = HTTP_TIMEOUT,
+    max_connections: int = HTTP_MAX_CONNECTIONS,
+    max_keepalive: int = HTTP_MAX_KEEPALIVE,
+    http2: Optional[bool] = None,
+) -> httpx.AsyncClient:
+    """Async twin of :func:`create_http_client` for event-loop senders."""
+    if http2 is None:
+        http2 = http2_available()
+    return httpx.AsyncClient(
+        timeout=timeout,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+class CircuitBreaker:
+    """Fail fast against a receiver that keeps failing.
+
+    Outcomes of the last ``window`` attempts are kept; once at least
+    ``min_calls`` are known and the failure rate reaches ``failure_rate`` the
+    circuit opens and :meth:`allow_request` refuses calls. After ``cooldown``
+    seconds it goes half-open and lets a single trial through: success closes
+    the circuit, failure opens it for another cooldown.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_rate: float = BREAKER_FAILURE_RATE,
+        window: int = BREAKER_WINDOW,
+        min_calls: int = BREAKER_MIN_CALLS,
+        cooldown: float = BREAKER_COOLDOWN,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self._clock = clock
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._close()
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._open()
+                return
+            self._outcomes.append(False)
+            if self._state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+                if self._current_failure_rate() >= self.failure_rate:
+                    self._open()
+
+    def snapshot(self) -> dict:
+        """Current state and counters, for logging and status endpoints."""
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                "state": self._state,
+                "failure_rate": round(self._current_failure_rate(), 3),
+                "calls": len(self._outcomes),
+                "rejected": self._rejected,
+                "opened_at": self._opened_at,
+            }
+
+    def _current_failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.cooldown:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._trial_in_flight = False
+
+    def _close(self):
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._outcomes.clear()
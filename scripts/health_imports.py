@@ -0,0 +1,25 @@
+"""Deferred imports for heavy optional-path dependencies."""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return ``name`` as a module that is only executed on first attribute access.
+
+    ``docker`` and ``httpx`` (with requests and asyncio behind them) take a
+    few hundred milliseconds to import, which a ``--once`` run answered by
+    the resident monitor never needs to pay.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,228 @@
+"""In-memory metrics for the health monitor, rendered in OpenMetrics text format."""
+
+import math
+import threading
+from typing import Iterable
+
+from health_checker import HealthResult, HealthStatus
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+RESPONSE_TIME_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+DURATION_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(float(bound))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        if not self.label_names:
+            # Unlabelled series exist from the start, so they graph as zero.
+            self._values[()] = self._initial()
+
+    def _initial(self):
+        return 0
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels[name] for name in self.label_names)
+
+    def render(self) -> list[str]:
+        lines = [f"# TYPE {self.name} {self.type_name}", f"# HELP {self.name} {self.help_text}"]
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda item: tuple(map(str, item[0])))
+            for key, value in items:
+                lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key: tuple, value) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self, key, value):
+        return [f"{self.name}_total{_format_labels(self.label_names, key)} {_format_value(value)}"]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _samples(self, key, value):
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str, buckets: Iterable[float], labels: Iterable[str] = ()
+    ):
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, help_text, labels)
+
+    def _initial(self):
+        return [[0] * len(self.buckets), 0.0, 0]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = self._initial()
+            counts = state[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self, key, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.label_names, key, f'le="{_format_bound(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.label_names, key)
+        lines.append(f"{self.name}_count{labels} {count}")
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        return lines
+
+
+class HealthMetrics:
+    """Counters the checker, notifier, alerter and monitor loop report into.
+
+    Everything is kept in memory and rendered on demand, so a scrape never
+    touches Docker or SQLite. Pass one instance to each component.
+    """
+
+    def __init__(self):
+        self.service_up = Gauge(
+            "health_service_up", "1 if the service's last check was healthy.", ["service"]
+        )
+        self.checks = Counter("health_checks", "Health check results.", ["service", "status"])
+        self.response_time = Histogram(
+            "health_check_response_time_ms",
+            "Health check response time in milliseconds.",
+            RESPONSE_TIME_BUCKETS_MS,
+            ["service"],
+        )
+        self.transitions = Counter(
+            "health_transitions", "Service state transitions.", ["service", "to_status"]
+        )
+        self.alerts = Counter("health_alerts", "Consecutive-failure alerts raised.", ["service"])
+        self.webhook_deliveries = Counter(
+            "health_webhook_deliveries", "Transition webhook deliveries by outcome.", ["result"]
+        )
+        self.webhook_latency = Histogram(
+            "health_webhook_request_seconds",
+            "Latency of individual webhook POST attempts.",
+            DURATION_BUCKETS_SECONDS,
+        )
+        self.sweep_duration = Histogram(
+            "health_sweep_duration_seconds",
+            "Time taken by a check sweep.",
+            DURATION_BUCKETS_SECONDS,
+        )
+        self.scheduler_lag = Gauge(
+            "health_scheduler_lag_seconds", "How late the last scheduled tick fired."
+        )
+        self.scheduler_overruns = Counter(
+            "health_scheduler_overruns", "Ticks that fired late because a sweep overran."
+        )
+        self.scheduler_skipped = Counter(
+            "health_scheduler_skipped_ticks", "Ticks skipped after an overrun."
+        )
+        self._scheduler_seen = {"overruns": 0, "skipped": 0}
+        self._metrics = [
+            self.service_up,
+            self.checks,
+            self.response_time,
+            self.transitions,
+            self.alerts,
+            self.webhook_deliveries,
+            self.webhook_latency,
+            self.sweep_duration,
+            self.scheduler_lag,
+            self.scheduler_overruns,
+            self.scheduler_skipped,
+        ]
+
+    def observe_results(self, results: Iterable[HealthResult]):
+        for result in results:
+            service = result.service_name
+            self.service_up.set(1 if result.status == HealthStatus.HEALTHY else 0, service=service)
+            self.checks.inc(service=service, status=result.status.value)
+            self.response_time.observe(result.response_time_ms, service=service)
+
+    def observe_transition(self, service_name: str, to_status: str):
+        self.transitions.inc(service=service_name, to_status=to_status)
+
+    def observe_alert(self, service_name: str):
+        self.alerts.inc(service=service_name)
+
+    def observe_webhook_request(self, seconds: float):
+        self.webhook_latency.observe(seconds)
+
+    def observe_webhook_delivery(self, ok: bool):
+        self.webhook_deliveries.inc(result="sent" if ok else "failed")
+
+    def observe_sweep(self, seconds: float):
+        self.sweep_duration.observe(seconds)
+
+    def observe_scheduler(self, stats: dict):
+        """Take a scheduler's stats(); counters advance by the change since last call."""
+        self.scheduler_lag.set(stats["last_lag"])
+        counters = (("overruns", self.scheduler_overruns), ("skipped", self.scheduler_skipped))
+        for key, counter in counters:
+            delta = stats[key] - self._scheduler_seen[key]
+            if delta > 0:
+                counter.inc(delta)
+                self._scheduler_seen[key] = stats[key]
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
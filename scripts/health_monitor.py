@@ -6,34 +6,173 @@ import os
 import sys
 import time
 from pathlib import Path
+from typing import Optional
 
 scripts_dir = Path(__file__).parent
 if str(scripts_dir) not in sys.path:
     sys.path.insert(0, str(scripts_dir))
 
-from health_checker import HealthChecker, HealthStatus
-from health_notifier import HealthNotifier
+from health_api import (
+    API_PORT,
+    API_SOCKET,
+    TRANSITIONS_KEPT,
+    HealthAPIServer,
+    HealthAPITCPServer,
+    MonitorState,
+    fetch_json,
+)
+from health_alerter import (
+    ALERT_THRESHOLD,
+    ALERT_WEBHOOK_URL,
+    COALESCE_WINDOW,
+    ConsoleAlertChannel,
+    HealthAlerter,
+    WebhookAlertChannel,
+)
+from health_checker import (
+    CHECK_BULK,
+    CHECK_WORKERS,
+    SERVICE_CONTAINERS,
+    HealthChecker,
+    HealthStatus,
+)
+from health_http import CircuitBreaker, create_http_client
+from health_metrics import HealthMetrics
+from health_notifier import WEBHOOK_URL, HealthNotifier
+from health_scheduler import (
+    ADAPTIVE,
+    SERVICE_INTERVALS,
+    FixedRateScheduler,
+    ServiceScheduler,
+    parse_service_intervals,
+)
 from health_storage import HealthStorage
 
 DEFAULT_INTERVAL = int(os.getenv("HEALTH_CHECK_INTERVAL", "60"))
+DEFAULT_RECONCILE_INTERVAL = int(os.getenv("HEALTH_RECONCILE_INTERVAL", "300"))
+COMPACT_INTERVAL = 3600
+SHUTDOWN_DRAIN_TIMEOUT = 10
+# --once redelivers due outbox webhooks for at most this many seconds, so a
+# cron run stays short even with a long backlog.
+ONCE_OUTBOX_TIMEOUT = 5
+# --once accepts the resident monitor's results if every service was checked
+# within this many seconds.
+DAEMON_MAX_AGE = int(os.getenv("HEALTH_DAEMON_MAX_AGE", "300"))
 
 
-def run_once(verbose: bool = False) -> int:
-    """Run health checks once. Returns 0 if all healthy, 1 if unhealthy, 2 on error."""
+def compact_storage(storage: HealthStorage, verbose: bool = False):
+    """Roll checks past the raw retention window up into the rollup tables."""
+    compacted = storage.compact()
+    if verbose and compacted:
+        print(f"Compacted {compacted} health checks into rollups")
+
+
+def create_alerter(
+    storage: HealthStorage, http_client=None, metrics: Optional[HealthMetrics] = None
+) -> HealthAlerter:
+    """Build the consecutive-failure alerter, resuming streaks from storage."""
+    channels = [ConsoleAlertChannel()]
+    if ALERT_WEBHOOK_URL:
+        channels.append(
+            WebhookAlertChannel(ALERT_WEBHOOK_URL, client=http_client, breaker=CircuitBreaker())
+        )
+    alerter = HealthAlerter(
+        channels, threshold=ALERT_THRESHOLD, coalesce_window=COALESCE_WINDOW, metrics=metrics
+    )
+    alerter.tracker.seed(storage.get_failure_streaks())
+    return alerter
+
+
+def create_monitor_state(
+    storage: HealthStorage, alerter: HealthAlerter, metrics: Optional[HealthMetrics] = None
+) -> MonitorState:
+    """In-memory state for the query API, seeded from storage."""
+    return MonitorState(
+        metrics=metrics,
+        history=alerter.history,
+        uptime=storage.get_uptime_stats,
+        statuses=storage.get_last_statuses(list(SERVICE_CONTAINERS)),
+        transitions=storage.get_recent_transitions(TRANSITIONS_KEPT),
+    )
+
+
+def start_api(state: MonitorState) -> list:
+    """Serve the query API on HEALTH_API_SOCKET and/or 127.0.0.1:HEALTH_API_PORT."""
+    servers = []
+    try:
+        if API_SOCKET:
+            servers.append(HealthAPIServer(API_SOCKET, state).start())
+        if API_PORT:
+            servers.append(HealthAPITCPServer(API_PORT, state).start())
+    except OSError as e:
+        print(f"WARNING: query API unavailable: {e}", file=sys.stderr)
+    return servers
+
+
+def run_once_via_daemon(verbose: bool = False) -> Optional[int]:
+    """Report the resident monitor's latest results without touching Docker.
+
+    Returns None when no monitor answers on HEALTH_API_SOCKET or its results
+    are incomplete or older than DAEMON_MAX_AGE.
+    """
+    if not API_SOCKET:
+        return None
+    status = fetch_json(API_SOCKET, "/status")
+    if not status:
+        return None
+    by_service = {entry["service"]: entry for entry in status}
+    if any(name not in by_service for name in SERVICE_CONTAINERS):
+        return None
+    oldest = min(by_service[name]["checked_at"] for name in SERVICE_CONTAINERS)
+    if time.time() - oldest > DAEMON_MAX_AGE:
+        return None
+
+    all_healthy = True
+    for name in SERVICE_CONTAINERS:
+        entry = by_service[name]
+        healthy = entry["status"] == HealthStatus.HEALTHY.value
+        if verbose:
+            icon = "+" if healthy else "x"
+            print(f"  {icon} {name}: {entry['status']} ({entry['response_time_ms']}ms)")
+        all_healthy = all_healthy and healthy
+    return 0 if all_healthy else 1
+
+
+def run_once(
+    verbose: bool = False,
+    workers: int = CHECK_WORKERS,
+    bulk: bool = CHECK_BULK,
+    use_daemon: bool = True,
+) -> int:
+    """Run health checks once. Returns 0 if all healthy, 1 if unhealthy, 2 on error.
+
+    If a resident monitor serves the status API, its results are reported
+    instead, skipping Docker and storage entirely.
+    """
+    if use_daemon:
+        exit_code = run_once_via_daemon(verbose)
+        if exit_code is not None:
+            return exit_code
+
     try:
-        checker = HealthChecker()
+        checker = HealthChecker(max_workers=workers, bulk=bulk)
     except RuntimeError as e:
         print(f"ERROR: {e}", file=sys.stderr)
         return 2
 
     storage = HealthStorage()
     notifier = HealthNotifier(storage)
+    alerter = create_alerter(storage)
 
     results = checker.check_all_services()
     all_healthy = True
     transitions = []
 
+    transition_ids = notifier.process_results(results)
     for result in results:
+        alerter.process_result(result)
+
+    for result, transition_id in zip(results, transition_ids):
         if verbose:
             icon = "+" if result.status == HealthStatus.HEALTHY else "x"
             print(f"  {icon} {result.service_name}: {result.status.value} ({result.response_time_ms}ms)")
@@ -41,7 +180,6 @@ def run_once(verbose: bool = False) -> int:
         if result.status != HealthStatus.HEALTHY:
             all_healthy = False
 
-        transition_id = notifier.process_result(result)
         if transition_id:
             transitions.append({"service": result.service_name, "status": result.status.value})
 
@@ -50,54 +188,206 @@ def run_once(verbose: bool = False) -> int:
         for t in transitions:
             print(f"  - {t['service']} -> {t['status']}")
 
+    redelivered = notifier.drain_outbox(timeout=ONCE_OUTBOX_TIMEOUT)
+    if verbose and redelivered:
+        print(f"Redelivered {redelivered} pending webhooks")
+
+    compact_storage(storage, verbose)
+    alerter.close()
+    storage.close()
     return 0 if all_healthy else 1
 
 
-def run_continuous(interval: int = DEFAULT_INTERVAL, verbose: bool = False) -> int:
-    """Run health checks continuously at specified interval."""
+def run_continuous(
+    interval: int = DEFAULT_INTERVAL,
+    verbose: bool = False,
+    workers: int = CHECK_WORKERS,
+    bulk: bool = CHECK_BULK,
+    adaptive: bool = ADAPTIVE,
+    service_intervals: str = SERVICE_INTERVALS,
+) -> int:
+    """Run health checks continuously at specified interval.
+
+    With per-service intervals or ``adaptive`` set, each service is checked on
+    its own schedule instead of in whole sweeps.
+    """
+    metrics = HealthMetrics()
     try:
-        checker = HealthChecker()
-    except RuntimeError as e:
+        intervals = parse_service_intervals(service_intervals)
+        checker = HealthChecker(max_workers=workers, bulk=bulk, metrics=metrics)
+    except (RuntimeError, ValueError) as e:
         print(f"ERROR: {e}", file=sys.stderr)
         return 2
 
     storage = HealthStorage()
-    notifier = HealthNotifier(storage)
+    http_client = create_http_client() if WEBHOOK_URL or ALERT_WEBHOOK_URL else None
+    notifier = HealthNotifier(
+        storage, background=True, client=http_client, breaker=CircuitBreaker(), metrics=metrics
+    )
+    alerter = create_alerter(storage, http_client, metrics)
+    state = create_monitor_state(storage, alerter, metrics)
+    api_servers = start_api(state)
 
     print(f"Starting continuous health monitoring (interval: {interval}s)")
 
+    scheduler = FixedRateScheduler(interval)
+    service_scheduler = None
+    if adaptive or intervals:
+        service_scheduler = ServiceScheduler(
+            SERVICE_CONTAINERS, interval, intervals, adaptive=adaptive
+        )
     try:
+        next_compaction = time.monotonic()
         while True:
+            if service_scheduler is not None:
+                due = service_scheduler.wait()
+                metrics.observe_scheduler(service_scheduler.stats())
+            else:
+                scheduler.wait()
+                metrics.observe_scheduler(scheduler.stats())
             timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-            if verbose:
-                print(f"[{timestamp}] Running health checks...")
+            if time.monotonic() >= next_compaction:
+                compact_storage(storage, verbose)
+                next_compaction = time.monotonic() + COMPACT_INTERVAL
 
-            results = checker.check_all_services()
-            for result in results:
-                tid = notifier.process_result(result)
+            if service_scheduler is not None:
+                if verbose:
+                    print(f"[{timestamp}] Checking {', '.join(due)}...")
+                results = checker.check_services(due)
+            else:
+                if verbose:
+                    print(f"[{timestamp}] Running health checks...")
+                results = checker.check_all_services()
+
+            transition_ids = notifier.process_results(results)
+            state.record(results, transition_ids)
+            for result, tid in zip(results, transition_ids):
+                alerter.process_result(result)
+                if service_scheduler is not None:
+                    service_scheduler.record(result)
                 if tid:
                     print(f"[{timestamp}] TRANSITION: {result.service_name} -> {result.status.value}")
 
             if verbose:
                 print(f"[{timestamp}] Check complete")
+    except KeyboardInterrupt:
+        print("\nStopping health monitor")
+        if verbose and service_scheduler is None:
+            stats = scheduler.stats()
+            print(
+                f"Sweeps: {stats['ticks']}, overran: {stats['overruns']}, "
+                f"skipped ticks: {stats['skipped']}"
+            )
+        elif verbose:
+            stats = service_scheduler.stats()
+            print(f"Checks: {stats['ticks']}, started late: {stats['overruns']}")
+        return 0
+    finally:
+        for server in api_servers:
+            server.close()
+        notifier.close(timeout=SHUTDOWN_DRAIN_TIMEOUT)
+        alerter.close()
+        if http_client is not None:
+            http_client.close()
+        storage.close()
+
+
+def run_events(
+    reconcile_interval: int = DEFAULT_RECONCILE_INTERVAL,
+    verbose: bool = False,
+    workers: int = CHECK_WORKERS,
+    bulk: bool = CHECK_BULK,
+) -> int:
+    """Track health from the Docker events stream, with a periodic full sweep."""
+    metrics = HealthMetrics()
+    try:
+        checker = HealthChecker(max_workers=workers, bulk=bulk, metrics=metrics)
+    except RuntimeError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+
+    storage = HealthStorage()
+    http_client = create_http_client() if WEBHOOK_URL or ALERT_WEBHOOK_URL else None
+    notifier = HealthNotifier(
+        storage, background=True, client=http_client, breaker=CircuitBreaker(), metrics=metrics
+    )
+    alerter = create_alerter(storage, http_client, metrics)
+    state = create_monitor_state(storage, alerter, metrics)
+    api_servers = start_api(state)
+
+    print(f"Starting event-driven health monitoring (reconcile interval: {reconcile_interval}s)")
+
+    try:
+        since = int(time.time())
+        next_compaction = time.monotonic()
+        while True:
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+            if time.monotonic() >= next_compaction:
+                compact_storage(storage, verbose)
+                next_compaction = time.monotonic() + COMPACT_INTERVAL
+
+            if verbose:
+                print(f"[{timestamp}] Running reconciliation sweep...")
+
+            results = checker.check_all_services()
+            transition_ids = notifier.process_results(results)
+            state.record(results, transition_ids)
+            for result, tid in zip(results, transition_ids):
+                alerter.process_result(result)
+                if tid:
+                    print(f"[{timestamp}] TRANSITION: {result.service_name} -> {result.status.value}")
 
-            time.sleep(interval)
+            # Replaying from the previous window's end means nothing is lost
+            # between streams; duplicate results never produce a transition.
+            until = int(time.time()) + reconcile_interval
+            try:
+                for result in checker.watch_events(since=since, until=until):
+                    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+                    if verbose:
+                        print(f"[{timestamp}] EVENT: {result.service_name}: {result.status.value}")
+                    tid = notifier.process_result(result)
+                    state.record([result], [tid])
+                    alerter.process_result(result)
+                    if tid:
+                        print(f"[{timestamp}] TRANSITION: {result.service_name} -> {result.status.value}")
+            except Exception as e:
+                # The stream drops when the daemon restarts; the next sweep
+                # reconciles whatever was missed.
+                print(f"[{timestamp}] ERROR: event stream interrupted: {e}", file=sys.stderr)
+                time.sleep(min(5, reconcile_interval))
+            since = until
     except KeyboardInterrupt:
         print("\nStopping health monitor")
         return 0
+    finally:
+        for server in api_servers:
+            server.close()
+        notifier.close(timeout=SHUTDOWN_DRAIN_TIMEOUT)
+        alerter.close()
+        if http_client is not None:
+            http_client.close()
+        storage.close()
 
 
 def main():
     parser = argparse.ArgumentParser(description="Health monitor for Postiz Docker Compose stack")
     parser.add_argument("--once", action="store_true", help="Run checks once and exit")
+    parser.add_argument("--local", action="store_true", help="With --once, check Docker directly even if a resident monitor is running")
+    parser.add_argument("--events", action="store_true", help="Track health from Docker events instead of polling")
+    parser.add_argument("--reconcile-interval", type=int, default=DEFAULT_RECONCILE_INTERVAL, help=f"Seconds between full sweeps in --events mode (default: {DEFAULT_RECONCILE_INTERVAL})")
     parser.add_argument("--interval", type=int, default=DEFAULT_INTERVAL, help=f"Seconds between checks (default: {DEFAULT_INTERVAL})")
+    parser.add_argument("--workers", type=int, default=CHECK_WORKERS, help=f"Concurrent container probes per sweep; 1 checks sequentially (default: {CHECK_WORKERS})")
+    parser.add_argument("--bulk", action="store_true", default=CHECK_BULK, help="Check all containers from a single container listing")
+    parser.add_argument("--adaptive", action="store_true", default=ADAPTIVE, help="Poll failing or flapping services fast and back off while healthy")
     parser.add_argument("-v", "--verbose", action="store_true", help="Show detailed output")
     args = parser.parse_args()
 
     if args.once:
-        sys.exit(run_once(verbose=args.verbose))
+        sys.exit(run_once(verbose=args.verbose, workers=args.workers, bulk=args.bulk, use_daemon=not args.local))
+    elif args.events:
+        sys.exit(run_events(reconcile_interval=args.reconcile_interval, verbose=args.verbose, workers=args.workers, bulk=args.bulk))
     else:
-        sys.exit(run_continuous(interval=args.interval, verbose=args.verbose))
+        sys.exit(run_continuous(interval=args.interval, verbose=args.verbose, workers=args.workers, bulk=args.bulk, adaptive=args.adaptive))
 
 
 if __name__ == "__main__":
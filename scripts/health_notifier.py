@@ -1,25 +1,319 @@
 """State transition detection and webhook notification for health monitoring."""
 
+from __future__ import annotations
+
+import logging
 import os
+import queue
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Optional
-
-import httpx
+from typing import Callable, Collection, Optional
 
 from health_checker import HealthResult
+from health_http import CircuitBreaker
+from health_imports import lazy_import
+from health_metrics import HealthMetrics
 from health_storage import HealthStorage
 
+httpx = lazy_import("httpx")
+
+logger = logging.getLogger("health_notifier")
+
 WEBHOOK_URL = os.getenv("HEALTH_WEBHOOK_URL", "")
 STACK_NAME = "postiz-social-automation"
 MAX_RETRIES = 3
 RETRY_BACKOFF = [1, 2, 4]
+DELIVERY_QUEUE_SIZE = 1000
+COALESCE_WINDOW = float(os.getenv("HEALTH_COALESCE_WINDOW", "5"))
+
+OUTBOX_INTERVAL = float(os.getenv("HEALTH_OUTBOX_INTERVAL", "30"))
+# A background drain starts no new wave after this many seconds.
+OUTBOX_DRAIN_TIMEOUT = 60.0
+OUTBOX_MAX_IN_FLIGHT = int(os.getenv("HEALTH_OUTBOX_MAX_IN_FLIGHT", "4"))
+OUTBOX_BATCH_SIZE = 200
+OUTBOX_BASE_DELAY = 5.0
+OUTBOX_MAX_DELAY = 3600.0
+OUTBOX_MAX_AGE_HOURS = 24
+
+_STOP = object()
+
+
+class WebhookOutbox:
+    """Redelivers transitions whose webhook was never acknowledged.
+
+    Unsent rows in state_transitions are the outbox. Each failed attempt pushes
+    the row's next attempt out with exponential backoff and jitter, and at most
+    ``max_in_flight`` deliveries run at once. A drain stops as soon as a whole
+    wave of deliveries fails, so a receiver that is still down is probed
+    rather than flooded.
+
+    ``deliver`` returns True once delivered, False to retry later, or None if
+    the receiver rejected the payload outright; rejected rows leave the outbox.
+    Rows whose IDs ``exclude`` returns are still queued for immediate delivery
+    and are left alone.
+    """
+
+    def __init__(
+        self,
+        storage: HealthStorage,
+        deliver: Callable[[dict], Optional[bool]],
+        max_in_flight: int = OUTBOX_MAX_IN_FLIGHT,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        base_delay: float = OUTBOX_BASE_DELAY,
+        max_delay: float = OUTBOX_MAX_DELAY,
+        max_age_hours: int = OUTBOX_MAX_AGE_HOURS,
+        exclude: Optional[Callable[[], Collection[int]]] = None,
+    ):
+        self.storage = storage
+        self.deliver = deliver
+        self.exclude = exclude
+        self.max_in_flight = max(1, max_in_flight)
+        self.batch_size = batch_size
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_age_hours = max_age_hours
+
+    def next_delay(self, attempts: int) -> float:
+        """Backoff before retry number ``attempts``, with jitter in [50%, 100%]."""
+        delay = min(self.max_delay, self.base_delay * 2 ** max(attempts - 1, 0))
+        return delay * random.uniform(0.5, 1.0)
+
+    def schedule_retry(self, transition_id: int, attempts: int = 1):
+        self.storage.schedule_webhook_retry(
+            transition_id, time.time() + self.next_delay(attempts)
+        )
+
+    def drain(self, timeout: Optional[float] = None) -> int:
+        """Attempt every due delivery once. Returns the number delivered.
+
+        With ``timeout``, no new wave is started once that many seconds have
+        passed; whatever is left stays due for the next drain.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delivered = 0
+        with ThreadPoolExecutor(
+            max_workers=self.max_in_flight, thread_name_prefix="webhook-outbox"
+        ) as pool:
+            while True:
+                rows = self.storage.get_pending_transitions(
+                    limit=self.batch_size, max_age_hours=self.max_age_hours
+                )
+                if rows and self.exclude is not None:
+                    queued = self.exclude()
+                    rows = [row for row in rows if row["id"] not in queued]
+                if not rows:
+                    return delivered
+                for start in range(0, len(rows), self.max_in_flight):
+                    if deadline is not None and time.monotonic() >= deadline:
+                        return delivered
+                    wave = rows[start:start + self.max_in_flight]
+                    outcomes = list(pool.map(self._attempt, wave))
+                    for row, ok in zip(wave, outcomes):
+                        if ok:
+                            self.storage.mark_webhook_sent(row["id"])
+                        elif ok is None:
+                            self.storage.mark_webhook_rejected(row["id"])
+                        else:
+                            self.schedule_retry(row["id"], row["delivery_attempts"] + 1)
+                    if all(ok is False for ok in outcomes):
+                        return delivered
+                    delivered += sum(ok is True for ok in outcomes)
+
+    def _attempt(self, row: dict) -> Optional[bool]:
+        try:
+            return self.deliver(row)
+        except Exception:
+            logger.exception("Outbox delivery for transition %s failed", row["id"])
+            return False
+
+
+class WebhookDeliveryQueue:
+    """Runs webhook deliveries on a background thread so enqueueing never blocks.
+
+    With ``send_batch`` and a ``coalesce_window``, deliveries queued within
+    the window of the first one are sent together as a single request.
+    Deliveries that are dropped because the queue is full, or that fail, keep
+    ``webhook_sent = FALSE`` in state_transitions. A send returning None was
+    rejected outright and goes to ``on_rejected`` instead of ``on_failed``.
+
+    ``idle`` (the outbox drain) runs on a thread of its own, once at startup
+    and then every ``idle_interval`` seconds, so a long drain never holds up
+    new deliveries. :meth:`queued_ids` lets it skip transitions still queued.
+    """
+
+    def __init__(
+        self,
+        send: Callable[..., Optional[bool]],
+        on_delivered: Callable[[int], None],
+        max_size: int = DELIVERY_QUEUE_SIZE,
+        on_failed: Optional[Callable[[int], None]] = None,
+        idle: Optional[Callable[[], object]] = None,
+        idle_interval: float = OUTBOX_INTERVAL,
+        send_batch: Optional[Callable[[list[dict]], Optional[bool]]] = None,
+        coalesce_window: float = 0.0,
+        on_rejected: Optional[Callable[[int], None]] = None,
+    ):
+        self._send = send
+        self._send_batch = send_batch
+        self._coalesce_window = coalesce_window if send_batch else 0.0
+        self._on_delivered = on_delivered
+        self._on_failed = on_failed
+        self._on_rejected = on_rejected
+        self._idle = idle
+        self._idle_interval = idle_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._queued: set[int] = set()
+        self._queued_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="webhook-delivery", daemon=True)
+        self._thread.start()
+        self._idle_thread: Optional[threading.Thread] = None
+        if idle is not None:
+            self._idle_thread = threading.Thread(
+                target=self._run_idle_loop, name="webhook-outbox-drain", daemon=True
+            )
+            self._idle_thread.start()
+
+    def enqueue(self, transition_id: int, **payload) -> bool:
+        """Queue a delivery. Returns False if the queue is full."""
+        with self._queued_lock:
+            self._queued.add(transition_id)
+        try:
+            self._queue.put_nowait((transition_id, payload))
+            return True
+        except queue.Full:
+            self._forget([transition_id])
+            logger.warning("Webhook queue full, dropping delivery for transition %s", transition_id)
+            return False
+
+    def queued_ids(self) -> frozenset[int]:
+        """IDs of transitions waiting in, or being delivered from, the queue."""
+        with self._queued_lock:
+            return frozenset(self._queued)
+
+    def _forget(self, transition_ids: list[int]):
+        with self._queued_lock:
+            self._queued.difference_update(transition_ids)
+
+    def join(self):
+        """Block until every queued delivery has been attempted."""
+        self._queue.join()
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop the workers after they finish the deliveries already queued."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._stopped.set()
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._idle_thread is not None:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            self._idle_thread.join(remaining)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            batch = [item]
+            stopping = self._collect(batch)
+            try:
+                self._deliver(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stopping:
+                self._queue.task_done()
+                return
+
+    def _collect(self, batch: list) -> bool:
+        """Add deliveries arriving within the coalesce window. Returns True on stop."""
+        deadline = time.monotonic() + self._coalesce_window
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return False
+            if item is _STOP:
+                return True
+            batch.append(item)
+
+    def _deliver(self, batch: list):
+        try:
+            if len(batch) == 1:
+                transition_id, payload = batch[0]
+                outcomes = [(transition_id, self._send(**payload))]
+            else:
+                ok = self._send_batch([payload for _, payload in batch])
+                outcomes = [(transition_id, ok) for transition_id, _ in batch]
+            for transition_id, ok in outcomes:
+                if ok:
+                    self._on_delivered(transition_id)
+                elif ok is None and self._on_rejected is not None:
+                    self._on_rejected(transition_id)
+                elif ok is not None and self._on_failed is not None:
+                    self._on_failed(transition_id)
+        except Exception:
+            logger.exception("Webhook delivery failed")
+        finally:
+            self._forget([transition_id for transition_id, _ in batch])
+
+    def _run_idle_loop(self):
+        while True:
+            self._run_idle()
+            if self._stopped.wait(self._idle_interval):
+                return
+
+    def _run_idle(self):
+        if self._idle is None:
+            return
+        try:
+            self._idle()
+        except Exception:
+            logger.exception("Webhook delivery idle task failed")
 
 
 class HealthNotifier:
-    def __init__(self, storage: HealthStorage, webhook_url: str = WEBHOOK_URL):
+    def __init__(
+        self,
+        storage: HealthStorage,
+        webhook_url: str = WEBHOOK_URL,
+        background: bool = False,
+        client: Optional[httpx.Client] = None,
+        coalesce_window: float = COALESCE_WINDOW,
+        breaker: Optional[CircuitBreaker] = None,
+        metrics: Optional[HealthMetrics] = None,
+    ):
         self.storage = storage
         self.webhook_url = webhook_url
+        self.client = client
+        self.breaker = breaker
+        self.metrics = metrics
+        self.coalesce_window = coalesce_window
+        self.outbox = WebhookOutbox(storage, self._deliver_pending, exclude=self._queued_ids)
+        self.delivery: Optional[WebhookDeliveryQueue] = None
+        if background and webhook_url:
+            self.delivery = WebhookDeliveryQueue(
+                self._send_change,
+                storage.mark_webhook_sent,
+                on_failed=self.outbox.schedule_retry,
+                idle=self._drain_outbox_background,
+                send_batch=self._send_changes,
+                coalesce_window=coalesce_window,
+                on_rejected=storage.mark_webhook_rejected,
+            )
+
+    def close(self, timeout: Optional[float] = None):
+        """Let queued webhook deliveries finish, waiting at most ``timeout`` seconds."""
+        if self.delivery is not None:
+            self.delivery.close(timeout)
 
     def process_result(self, result: HealthResult) -> Optional[int]:
         """Process a health check result. Returns transition ID if state changed."""
@@ -33,6 +327,9 @@ class HealthNotifier:
             details=result.details,
         )
 
+        if self.metrics is not None:
+            self.metrics.observe_results([result])
+
         if previous_status is None or previous_status == current_status:
             return None
 
@@ -40,19 +337,121 @@ class HealthNotifier:
             service_name=result.service_name,
             from_status=previous_status,
             to_status=current_status,
+            details=result.details,
+        )
+        if self.metrics is not None:
+            self.metrics.observe_transition(result.service_name, current_status)
+        self._notify(transition_id, result, previous_status)
+        return transition_id
+
+    def process_results(self, results: list[HealthResult]) -> list[Optional[int]]:
+        """Process a whole sweep with one status lookup and one write transaction.
+
+        Returns a transition ID (or None) for each result, in order.
+        """
+        previous = self.storage.get_last_statuses(
+            list(dict.fromkeys(r.service_name for r in results))
         )
 
-        if self.webhook_url:
-            success = self.send_webhook(
-                service_name=result.service_name,
-                from_status=previous_status,
-                to_status=current_status,
-                details=result.details,
+        checks = []
+        transitions = []
+        changed = []
+        for index, result in enumerate(results):
+            current_status = result.status.value
+            previous_status = previous.get(result.service_name)
+            previous[result.service_name] = current_status
+
+            checks.append(
+                (result.service_name, current_status, result.response_time_ms, result.details)
+            )
+            if previous_status is not None and previous_status != current_status:
+                transitions.append(
+                    (result.service_name, previous_status, current_status, result.details)
+                )
+                changed.append((index, previous_status))
+
+        transition_ids = self.storage.record_sweep(checks, transitions)
+        if self.metrics is not None:
+            self.metrics.observe_results(results)
+            for service_name, _, to_status, _ in transitions:
+                self.metrics.observe_transition(service_name, to_status)
+
+        outcome: list[Optional[int]] = [None] * len(results)
+        notifications = []
+        for (index, previous_status), transition_id in zip(changed, transition_ids):
+            outcome[index] = transition_id
+            notifications.append((transition_id, results[index], previous_status))
+        self._notify_all(notifications)
+        return outcome
+
+    def _notify(self, transition_id: int, result: HealthResult, previous_status: str):
+        self._notify_all([(transition_id, result, previous_status)])
+
+    def _notify_all(self, notifications: list[tuple[int, HealthResult, str]]):
+        """Deliver one sweep's transitions.
+
+        With a coalesce window set, several transitions go out as a single
+        batch; with the window at 0 each is sent on its own.
+        """
+        if not self.webhook_url or not notifications:
+            return
+        payloads = [
+            (
+                transition_id,
+                {
+                    "service_name": result.service_name,
+                    "from_status": previous_status,
+                    "to_status": result.status.value,
+                    "details": result.details,
+                },
             )
-            if success:
+            for transition_id, result, previous_status in notifications
+        ]
+        if self.delivery is not None:
+            for transition_id, payload in payloads:
+                self.delivery.enqueue(transition_id, **payload)
+            return
+
+        if self.coalesce_window > 0 and len(payloads) > 1:
+            ok = self._send_changes([payload for _, payload in payloads])
+            outcomes = [(transition_id, ok) for transition_id, _ in payloads]
+        else:
+            outcomes = [
+                (transition_id, self._send_change(**payload)) for transition_id, payload in payloads
+            ]
+        for transition_id, ok in outcomes:
+            if ok:
                 self.storage.mark_webhook_sent(transition_id)
+            elif ok is None:
+                self.storage.mark_webhook_rejected(transition_id)
+            else:
+                self.outbox.schedule_retry(transition_id)
 
-        return transition_id
+    def drain_outbox(self, timeout: Optional[float] = None) -> int:
+        """Redeliver unsent transition webhooks that are due. Returns the number sent."""
+        if not self.webhook_url:
+            return 0
+        if self.breaker is not None and self.breaker.state == CircuitBreaker.OPEN:
+            return 0
+        return self.outbox.drain(timeout)
+
+    def _drain_outbox_background(self) -> int:
+        return self.drain_outbox(timeout=OUTBOX_DRAIN_TIMEOUT)
+
+    def _queued_ids(self) -> Collection[int]:
+        return self.delivery.queued_ids() if self.delivery is not None else ()
+
+    def _deliver_pending(self, row: dict) -> Optional[bool]:
+        # The outbox owns the backoff between attempts, so try each row once.
+        transitioned_at = datetime.strptime(row["transitioned_at"], "%Y-%m-%d %H:%M:%S")
+        return self._send_change(
+            service_name=row["service_name"],
+            from_status=row["from_status"],
+            to_status=row["to_status"],
+            details=row["details"],
+            timestamp=transitioned_at.replace(tzinfo=timezone.utc).isoformat(),
+            retry=False,
+        )
 
     def send_webhook(
         self,
@@ -60,30 +459,122 @@ class HealthNotifier:
         from_status: str,
         to_status: str,
         details: Optional[dict],
+        timestamp: Optional[str] = None,
+        retry: bool = True,
     ) -> bool:
         """Send webhook notification with retry logic."""
+        return bool(
+            self._send_change(service_name, from_status, to_status, details, timestamp, retry)
+        )
+
+    def send_webhook_batch(self, changes: list[dict], retry: bool = True) -> bool:
+        """Send several status changes as one webhook notification.
+
+        ``changes`` hold the keyword arguments of send_webhook. Used when a
+        correlated outage produces transitions for several services at once.
+        """
+        return bool(self._send_changes(changes, retry))
+
+    def _send_change(
+        self,
+        service_name: str,
+        from_status: str,
+        to_status: str,
+        details: Optional[dict],
+        timestamp: Optional[str] = None,
+        retry: bool = True,
+    ) -> Optional[bool]:
         payload = {
             "event": "service_status_change",
             "service": service_name,
             "from_status": from_status,
             "to_status": to_status,
             "details": details.get("error", "") if details else "",
+            "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
+            "stack": STACK_NAME,
+        }
+
+        return self._deliver(payload, retry)
+
+    def _send_changes(self, changes: list[dict], retry: bool = True) -> Optional[bool]:
+        payload = {
+            "event": "service_status_change_batch",
+            "changes": [
+                {
+                    "service": change["service_name"],
+                    "from_status": change["from_status"],
+                    "to_status": change["to_status"],
+                    "details": change["details"].get("error", "") if change.get("details") else "",
+                }
+                for change in changes
+            ],
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "stack": STACK_NAME,
         }
+        return self._deliver(payload, retry)
 
-        for attempt, backoff in enumerate(RETRY_BACKOFF):
+    def _deliver(self, payload: dict, retry: bool) -> Optional[bool]:
+        """POST ``payload``, retrying transient failures.
+
+        Returns True once delivered, False if it may succeed later, and None
+        when the receiver rejected it (400/401/403/404), which is not retried.
+        With a circuit breaker attached, an open circuit fails fast and the
+        transition is left to the outbox.
+        """
+        ok = self._deliver_with_retries(payload, retry)
+        if self.metrics is not None:
+            self.metrics.observe_webhook_delivery(bool(ok))
+        return ok
+
+    def _deliver_with_retries(self, payload: dict, retry: bool) -> Optional[bool]:
+        backoffs = RETRY_BACKOFF if retry else RETRY_BACKOFF[:1]
+        for attempt, backoff in enumerate(backoffs):
+            if self.breaker is not None and not self.breaker.allow_request():
+                logger.debug("Circuit open for %s, leaving delivery to the outbox", self.webhook_url)
+                return False
             try:
-                with httpx.Client(timeout=10.0) as client:
-                    resp = client.post(self.webhook_url, json=payload)
-                    if resp.status_code < 400:
-                        return True
-                    if resp.status_code in (400, 401, 403, 404):
-                        return False
+                resp = self._timed_post(payload)
+                if resp.status_code < 400:
+                    self._record_outcome(True)
+                    return True
+                if resp.status_code in (400, 401, 403, 404):
+                    # The receiver answered, so the circuit stays healthy.
+                    self._record_outcome(True)
+                    return None
             except httpx.RequestError:
                 pass
+            except Exception:
+                # Release a half-open trial before letting an unexpected error out.
+                self._record_outcome(False)
+                raise
+            self._record_outcome(False)
+            if self.breaker is not None and self.breaker.state != CircuitBreaker.CLOSED:
+                return False
 
-            if attempt < len(RETRY_BACKOFF) - 1:
+            if attempt < len(backoffs) - 1:
                 time.sleep(backoff)
 
         return False
+
+    def _record_outcome(self, ok: bool):
+        if self.breaker is None:
+            return
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def _timed_post(self, payload: dict) -> httpx.Response:
+        if self.metrics is None:
+            return self._post(payload)
+        start = time.perf_counter()
+        try:
+            return self._post(payload)
+        finally:
+            self.metrics.observe_webhook_request(time.perf_counter() - start)
+
+    def _post(self, payload: dict) -> httpx.Response:
+        if self.client is not None:
+            return self.client.post(self.webhook_url, json=payload, timeout=10.0)
+        with httpx.Client(timeout=10.0) as client:
+            return client.post(self.webhook_url, json=payload)
@@ -0,0 +1,231 @@
+"""Fixed-rate scheduling for periodic health sweeps."""
+
+import heapq
+import os
+import random
+import time
+from collections import deque
+from typing import Callable, Iterable, Optional
+
+from health_checker import SERVICE_CONTAINERS, HealthResult, HealthStatus
+
+# Random delay added to each tick, as a fraction of the interval, so that
+# several monitors started together do not probe Docker in lockstep.
+SCHEDULE_JITTER = float(os.getenv("HEALTH_SCHEDULE_JITTER", "0"))
+
+# Per-service intervals, e.g. "temporal-ui=300,postiz-postgres=15".
+SERVICE_INTERVALS = os.getenv("HEALTH_SERVICE_INTERVALS", "")
+ADAPTIVE = os.getenv("HEALTH_ADAPTIVE", "false").lower() in ("1", "true", "yes")
+ADAPTIVE_FAST_INTERVAL = float(os.getenv("HEALTH_ADAPTIVE_FAST_INTERVAL", "5"))
+ADAPTIVE_MAX_INTERVAL = float(os.getenv("HEALTH_ADAPTIVE_MAX_INTERVAL", "300"))
+# A service whose status changed this many times in its last FLAP_WINDOW
+# checks counts as flapping and keeps the fast interval.
+FLAP_WINDOW = 6
+FLAP_CHANGES = 2
+
+
+def parse_service_intervals(
+    spec: str, services: Iterable[str] = SERVICE_CONTAINERS
+) -> dict[str, float]:
+    """Parse ``name=seconds`` pairs separated by commas.
+
+    Names must be among ``services``, so a typo fails loudly instead of
+    silently leaving the service on the default interval.
+    """
+    known = set(services)
+    intervals = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, seconds = item.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"Invalid service interval {item!r}, expected name=seconds")
+        if name.strip() not in known:
+            raise ValueError(f"Unknown service {name.strip()!r} in service intervals")
+        value = float(seconds)
+        if value <= 0:
+            raise ValueError(f"Interval for {name.strip()} must be positive")
+        intervals[name.strip()] = value
+    return intervals
+
+
+class FixedRateScheduler:
+    """Paces a loop on deadlines of ``start + n * interval`` on a monotonic clock.
+
+    Unlike sleeping ``interval`` after each sweep, the time spent in the sweep
+    does not push later ticks back. A sweep that runs past its deadline makes
+    the next tick fire immediately; whole intervals missed on top of that are
+    skipped rather than run back to back. Both are counted in :meth:`stats`.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        jitter: float = SCHEDULE_JITTER,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.interval = interval
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng
+        self._start: Optional[float] = None
+        self._tick = 0
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.last_lag = 0.0
+
+    def wait(self) -> None:
+        """Block until the next tick. The first call returns immediately."""
+        now = self._clock()
+        if self._start is None:
+            self._start = now
+            self.ticks += 1
+            return
+
+        tick = self._tick + 1
+        deadline = self._start + tick * self.interval
+        if now > deadline:
+            missed = int((now - deadline) // self.interval)
+            self.overruns += 1
+            self.skipped += missed
+            self._tick = tick + missed
+            self.last_lag = now - (deadline + missed * self.interval)
+        else:
+            target = deadline
+            if self.jitter > 0:
+                target += self._rng() * self.jitter * self.interval
+            self._sleep(target - now)
+            self._tick = tick
+            self.last_lag = max(0.0, self._clock() - target)
+        self.ticks += 1
+
+    def stats(self) -> dict:
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "last_lag": round(self.last_lag, 3),
+        }
+
+
+class ServiceScheduler:
+    """Priority-queue scheduler giving each service its own check interval.
+
+    Services come due from a heap of ``(due_time, name)``. With ``adaptive``
+    set, a service that is failing or flapping is rechecked every
+    ``fast_interval`` seconds, and one that stays healthy backs off from its
+    base interval, doubling each check up to ``max_interval``.
+
+    :meth:`stats` has the same shape as FixedRateScheduler's: ``last_lag`` is
+    how far past its due time the most overdue service was picked up, and an
+    overrun is a wait that found a service already late. Like the fixed-rate
+    scheduler, each service is rescheduled from its previous due time rather
+    than from when its check finished, and whole intervals missed behind a
+    slow check are skipped.
+    """
+
+    def __init__(
+        self,
+        services: Iterable[str],
+        interval: float,
+        intervals: Optional[dict[str, float]] = None,
+        adaptive: bool = ADAPTIVE,
+        fast_interval: float = ADAPTIVE_FAST_INTERVAL,
+        max_interval: float = ADAPTIVE_MAX_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.interval = interval
+        self.intervals = intervals or {}
+        self.adaptive = adaptive
+        self.fast_interval = fast_interval
+        self.max_interval = max_interval
+        self._clock = clock
+        self._sleep = sleep
+        self._healthy_streak: dict[str, int] = {}
+        self._recent: dict[str, deque[HealthStatus]] = {}
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.last_lag = 0.0
+        self._due_at: dict[str, float] = {}
+        now = clock()
+        self._heap = [(now, name) for name in services]
+        heapq.heapify(self._heap)
+
+    def base_interval(self, service_name: str) -> float:
+        return self.intervals.get(service_name, self.interval)
+
+    def due(self) -> list[str]:
+        """Pop every service whose check is due now."""
+        now = self._clock()
+        names = []
+        if self._heap and self._heap[0][0] <= now:
+            self.last_lag = now - self._heap[0][0]
+        while self._heap and self._heap[0][0] <= now:
+            due_at, name = heapq.heappop(self._heap)
+            self._due_at[name] = due_at
+            names.append(name)
+        return names
+
+    def wait(self) -> list[str]:
+        """Sleep until at least one service is due and return the due services."""
+        slept = False
+        while True:
+            names = self.due()
+            if names or not self._heap:
+                if names:
+                    if not slept and self.ticks and self.last_lag > 0:
+                        self.overruns += 1
+                    self.ticks += 1
+                return names
+            slept = True
+            self._sleep(max(0.0, self._heap[0][0] - self._clock()))
+
+    def stats(self) -> dict:
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "last_lag": round(self.last_lag, 3),
+        }
+
+    def record(self, result: HealthResult) -> float:
+        """Reschedule a checked service from its result. Returns the delay chosen."""
+        name = result.service_name
+        delay = self.next_interval(name, result.status)
+        now = self._clock()
+        due_at = self._due_at.pop(name, now) + delay
+        if due_at <= now:
+            missed = int((now - due_at) // delay)
+            self.skipped += missed
+            due_at += missed * delay
+        heapq.heappush(self._heap, (due_at, name))
+        return delay
+
+    def next_interval(self, service_name: str, status: HealthStatus) -> float:
+        base = self.base_interval(service_name)
+        if not self.adaptive:
+            return base
+
+        recent = self._recent.setdefault(service_name, deque(maxlen=FLAP_WINDOW))
+        recent.append(status)
+        changes = sum(1 for a, b in zip(recent, list(recent)[1:]) if a != b)
+
+        if status != HealthStatus.HEALTHY or changes >= FLAP_CHANGES:
+            self._healthy_streak[service_name] = 0
+            return min(self.fast_interval, base)
+
+        # The streak stops growing at the cap; left unbounded, 2 ** streak
+        # eventually overflows a float.
+        streak = self._healthy_streak.get(service_name, 0)
+        cap = max(self.max_interval, base)
+        delay = min(base * 2 ** streak, cap)
+        if delay < cap:
+            self._healthy_streak[service_name] = streak + 1
+        return delay
@@ -3,46 +3,288 @@
 import json
 import os
 import sqlite3
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, Sequence
 
 DEFAULT_DB_PATH = Path(os.getenv("HEALTH_DB_PATH", "var/health.sqlite"))
+BUSY_TIMEOUT_MS = 5000
+RAW_RETENTION_DAYS = int(os.getenv("HEALTH_RAW_RETENTION_DAYS", "7"))
+# New transitions are delivered straight away by the notifier; the outbox only
+# considers them due once this many seconds have passed without a delivery.
+OUTBOX_GRACE_SECONDS = 60
+
+HISTORY_COLUMNS = ("id", "service_name", "status", "response_time_ms", "details", "checked_at")
+DEFAULT_HISTORY_COLUMNS = ("service_name", "status", "response_time_ms", "details", "checked_at")
+
+# Rollup resolution -> (checked_at prefix length, suffix) giving the bucket start,
+# bucket width in hours, and how many days of rollups to keep (None: forever).
+ROLLUP_BUCKETS = {
+    "minute": (16, ":00"),
+    "hour": (13, ":00:00"),
+    "day": (10, " 00:00:00"),
+}
+ROLLUP_WIDTH_HOURS = {"minute": 1 / 60, "hour": 1, "day": 24}
+ROLLUP_RETENTION_DAYS = {"minute": 30, "hour": 365, "day": None}
+# Hourly uptime counters are kept as long as the hourly rollups.
+UPTIME_RETENTION_DAYS = ROLLUP_RETENTION_DAYS["hour"]
+
+_ROLLUP_SCHEMA = "".join(
+    f"""
+    CREATE TABLE IF NOT EXISTS health_rollup_{resolution} (
+        service_name TEXT NOT NULL,
+        bucket_start TIMESTAMP NOT NULL,
+        healthy_count INTEGER NOT NULL DEFAULT 0,
+        unhealthy_count INTEGER NOT NULL DEFAULT 0,
+        missing_count INTEGER NOT NULL DEFAULT 0,
+        total_count INTEGER NOT NULL DEFAULT 0,
+        response_time_min INTEGER,
+        response_time_avg REAL,
+        response_time_max INTEGER,
+        response_time_p95 INTEGER,
+        PRIMARY KEY (service_name, bucket_start)
+    ) WITHOUT ROWID;
+    """
+    for resolution in ROLLUP_BUCKETS
+)
+
+# Hourly healthy/total counters per service, maintained by a trigger on every
+# insert so uptime over any window is a sum over bucket rows, not a table scan.
+_UPTIME_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS uptime_buckets (
+        service_name TEXT NOT NULL,
+        bucket_start TIMESTAMP NOT NULL,
+        healthy_count INTEGER NOT NULL DEFAULT 0,
+        total_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (service_name, bucket_start)
+    ) WITHOUT ROWID;
+
+    CREATE TRIGGER IF NOT EXISTS trg_health_checks_uptime
+    AFTER INSERT ON health_checks
+    BEGIN
+        INSERT INTO uptime_buckets (service_name, bucket_start, healthy_count, total_count)
+        VALUES (
+            NEW.service_name,
+            strftime('%Y-%m-%d %H:00:00', NEW.checked_at),
+            NEW.status = 'healthy',
+            1
+        )
+        ON CONFLICT (service_name, bucket_start) DO UPDATE SET
+            healthy_count = healthy_count + excluded.healthy_count,
+            total_count = total_count + 1;
+    END;
+"""
+
+# Seeds uptime_buckets from data recorded before the trigger existed; buckets
+# the trigger already filled are left alone.
+_UPTIME_BACKFILL = """
+    INSERT OR IGNORE INTO uptime_buckets (service_name, bucket_start, healthy_count, total_count)
+    SELECT service_name, bucket_start, SUM(healthy), SUM(total)
+    FROM (
+        SELECT service_name,
+               strftime('%Y-%m-%d %H:00:00', checked_at) AS bucket_start,
+               status = 'healthy' AS healthy,
+               1 AS total
+        FROM health_checks
+        UNION ALL
+        SELECT service_name, bucket_start, healthy_count, total_count
+        FROM health_rollup_hour
+    )
+    GROUP BY service_name, bucket_start;
+"""
+
+_BASE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS health_checks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        service_name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        response_time_ms INTEGER,
+        details TEXT,
+        checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_health_service_time
+        ON health_checks(service_name, checked_at);
+
+    CREATE TABLE IF NOT EXISTS state_transitions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        service_name TEXT NOT NULL,
+        from_status TEXT NOT NULL,
+        to_status TEXT NOT NULL,
+        webhook_sent BOOLEAN DEFAULT FALSE,
+        transitioned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_transitions_service
+        ON state_transitions(service_name, transitioned_at);
+"""
+
+# Time-leading indexes: history across all services and compaction seek on
+# checked_at, and the covering index answers status/response-time aggregation
+# without touching the table. uptime_buckets gets the same treatment.
+_TIME_INDEXES = """
+    CREATE INDEX IF NOT EXISTS idx_health_time_covering
+        ON health_checks(checked_at, service_name, status, response_time_ms);
+    CREATE INDEX IF NOT EXISTS idx_uptime_time_covering
+        ON uptime_buckets(bucket_start, service_name, healthy_count, total_count);
+"""
+
+# Left to itself the planner walks the (service_name, bucket_start) primary
+# key to satisfy GROUP BY, reading every bucket ever written; pinning the
+# time-leading index keeps the cost to the buckets inside the window.
+_UPTIME_QUERY = """
+    SELECT service_name, SUM(healthy_count), SUM(total_count)
+    FROM uptime_buckets INDEXED BY idx_uptime_time_covering
+    WHERE bucket_start >= strftime('%Y-%m-%d %H:00:00', 'now', ?)
+    GROUP BY service_name
+"""
+
+# Outbox bookkeeping for transition webhooks: the payload details, how many
+# deliveries were attempted and when (epoch seconds) the next one is due.
+_OUTBOX_SCHEMA = """
+    ALTER TABLE state_transitions ADD COLUMN details TEXT;
+    ALTER TABLE state_transitions ADD COLUMN delivery_attempts INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE state_transitions ADD COLUMN next_attempt_at REAL NOT NULL DEFAULT 0;
+    CREATE INDEX IF NOT EXISTS idx_transitions_pending
+        ON state_transitions(next_attempt_at) WHERE webhook_sent = FALSE;
+"""
+
+# Per-service status lookups: the newest healthy check of each service, used
+# to rebuild failure streaks on startup.
+_STATUS_INDEX = """
+    CREATE INDEX IF NOT EXISTS idx_health_service_status
+        ON health_checks(service_name, status);
+"""
+
+# Schema migrations, applied in order. PRAGMA user_version records how many
+# have run, so existing files are upgraded in place on startup. Only ever
+# append to this list.
+MIGRATIONS = [
+    _BASE_SCHEMA,
+    _ROLLUP_SCHEMA,
+    _UPTIME_SCHEMA + _UPTIME_BACKFILL,
+    _TIME_INDEXES,
+    _OUTBOX_SCHEMA,
+    _STATUS_INDEX,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def _split_statements(script: str) -> list[str]:
+    """Split a migration script into statements, keeping trigger bodies whole."""
+    statements = []
+    current = ""
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
+
+def _percentile(sorted_values: list[int], pct: float) -> int:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
 
 
 class HealthStorage:
+    """Health check persistence over one long-lived SQLite connection.
+
+    The database runs in WAL mode so other processes (reports, ``--once``
+    cron runs) can read while the monitor writes. The connection is shared
+    across threads and serialized with a lock; sqlite3 caches the prepared
+    statements for the lifetime of the connection.
+
+    The last recorded status of each service is cached in memory, warmed
+    once from the database and updated on every write through this instance.
+    """
+
     def __init__(self, db_path: Path = DEFAULT_DB_PATH):
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = self._connect()
         self._init_schema()
+        self._last_status = self._load_last_statuses()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        return conn
+
+    def close(self):
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def _init_schema(self):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.executescript(
-                """
-                CREATE TABLE IF NOT EXISTS health_checks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    service_name TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    response_time_ms INTEGER,
-                    details TEXT,
-                    checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                CREATE INDEX IF NOT EXISTS idx_health_service_time
-                    ON health_checks(service_name, checked_at);
-
-                CREATE TABLE IF NOT EXISTS state_transitions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    service_name TEXT NOT NULL,
-                    from_status TEXT NOT NULL,
-                    to_status TEXT NOT NULL,
-                    webhook_sent BOOLEAN DEFAULT FALSE,
-                    transitioned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                CREATE INDEX IF NOT EXISTS idx_transitions_service
-                    ON state_transitions(service_name, transitioned_at);
-                """
-            )
+        """Apply pending migrations; a no-op once the file is at SCHEMA_VERSION."""
+        with self._lock:
+            if self._schema_version() >= SCHEMA_VERSION:
+                return
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Re-read under the write lock in case another process migrated first.
+                version = self._schema_version()
+                for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+                    for statement in _split_statements(script):
+                        conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version = {number}")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def _schema_version(self) -> int:
+        return self._conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def _load_last_statuses(self) -> dict[str, str]:
+        # Row IDs follow insertion order; checked_at only has one-second resolution.
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT service_name, status FROM health_checks
+                   WHERE id IN (SELECT MAX(id) FROM health_checks GROUP BY service_name)"""
+            ).fetchall()
+            return dict(rows)
+
+    def get_failure_streaks(self) -> dict[str, int]:
+        """Count each service's checks since its last healthy one.
+
+        Services are enumerated with an index skip-scan, the last healthy row
+        comes from idx_health_service_status, and only the rows after it are
+        counted, so the cost follows the length of the streaks, not the table.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """WITH RECURSIVE services(name) AS (
+                       SELECT MIN(service_name) FROM health_checks
+                       UNION ALL
+                       SELECT (SELECT MIN(service_name) FROM health_checks
+                               WHERE service_name > name)
+                       FROM services WHERE name IS NOT NULL
+                   )
+                   SELECT name, (
+                       SELECT COUNT(*) FROM health_checks c
+                       WHERE +c.service_name = name AND c.id > COALESCE((
+                           SELECT MAX(id) FROM health_checks h
+                           WHERE h.service_name = name AND h.status = 'healthy'
+                       ), 0)
+                   )
+                   FROM services WHERE name IS NOT NULL"""
+            ).fetchall()
+            return dict(rows)
 
     def record_check(
         self,
@@ -52,7 +294,7 @@ class HealthStorage:
         details: Optional[dict] = None,
     ) -> int:
         """Record a health check result. Returns the row ID."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.execute(
                 """INSERT INTO health_checks
                    (service_name, status, response_time_ms, details)
@@ -64,35 +306,140 @@ class HealthStorage:
                     json.dumps(details) if details else None,
                 ),
             )
+            self._last_status[service_name] = status
             return cursor.lastrowid
 
     def get_last_status(self, service_name: str) -> Optional[str]:
         """Get the most recent status for a service."""
-        with sqlite3.connect(self.db_path) as conn:
-            row = conn.execute(
-                """SELECT status FROM health_checks
-                   WHERE service_name = ?
-                   ORDER BY checked_at DESC LIMIT 1""",
-                (service_name,),
-            ).fetchone()
-            return row[0] if row else None
+        return self._last_status.get(service_name)
+
+    def get_last_statuses(self, service_names: list[str]) -> dict[str, str]:
+        """Get the most recent status for each of the given services."""
+        return {
+            name: self._last_status[name]
+            for name in service_names
+            if name in self._last_status
+        }
+
+    def record_sweep(
+        self,
+        checks: list[tuple[str, str, Optional[int], Optional[dict]]],
+        transitions: list[tuple[str, str, str, Optional[dict]]],
+    ) -> list[int]:
+        """Record a sweep's checks and transitions in a single transaction.
+
+        ``checks`` are (service_name, status, response_time_ms, details) and
+        ``transitions`` are (service_name, from_status, to_status, details)
+        tuples. Returns the transition row IDs in the order given.
+        """
+        with self._lock, self._conn as conn:
+            conn.executemany(
+                """INSERT INTO health_checks
+                   (service_name, status, response_time_ms, details)
+                   VALUES (?, ?, ?, ?)""",
+                [
+                    (name, status, rt, json.dumps(details) if details else None)
+                    for name, status, rt, details in checks
+                ],
+            )
+            transition_ids = []
+            for name, from_status, to_status, details in transitions:
+                cursor = conn.execute(
+                    """INSERT INTO state_transitions
+                       (service_name, from_status, to_status, details, next_attempt_at)
+                       VALUES (?, ?, ?, ?, ?)""",
+                    (
+                        name,
+                        from_status,
+                        to_status,
+                        json.dumps(details) if details else None,
+                        time.time() + OUTBOX_GRACE_SECONDS,
+                    ),
+                )
+                transition_ids.append(cursor.lastrowid)
+        for name, status, _, _ in checks:
+            self._last_status[name] = status
+        return transition_ids
 
     def record_transition(
-        self, service_name: str, from_status: str, to_status: str
+        self,
+        service_name: str,
+        from_status: str,
+        to_status: str,
+        details: Optional[dict] = None,
     ) -> int:
         """Record a state transition. Returns the row ID."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.execute(
                 """INSERT INTO state_transitions
-                   (service_name, from_status, to_status)
-                   VALUES (?, ?, ?)""",
-                (service_name, from_status, to_status),
+                   (service_name, from_status, to_status, details, next_attempt_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (
+                    service_name,
+                    from_status,
+                    to_status,
+                    json.dumps(details) if details else None,
+                    time.time() + OUTBOX_GRACE_SECONDS,
+                ),
             )
             return cursor.lastrowid
 
+    def get_recent_transitions(self, limit: int = 50) -> list[dict]:
+        """Get the newest transitions, newest first."""
+        with self._lock:
+            cursor = self._conn.execute(
+                """SELECT id, service_name, from_status, to_status, transitioned_at
+                   FROM state_transitions ORDER BY id DESC LIMIT ?""",
+                (limit,),
+            )
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def get_pending_transitions(
+        self, limit: int = 100, max_age_hours: int = 24, now: Optional[float] = None
+    ) -> list[dict]:
+        """Get unsent transitions whose next delivery attempt is due, oldest first."""
+        with self._lock:
+            cursor = self._conn.execute(
+                """SELECT id, service_name, from_status, to_status, details,
+                          delivery_attempts, transitioned_at
+                   FROM state_transitions
+                   WHERE webhook_sent = FALSE
+                     AND next_attempt_at <= ?
+                     AND transitioned_at >= datetime('now', ?)
+                   ORDER BY id
+                   LIMIT ?""",
+                (time.time() if now is None else now, f"-{max_age_hours} hours", limit),
+            )
+            columns = [c[0] for c in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor]
+        for row in rows:
+            row["details"] = json.loads(row["details"]) if row["details"] else None
+        return rows
+
+    def schedule_webhook_retry(self, transition_id: int, next_attempt_at: float):
+        """Count a failed delivery and push the next attempt to ``next_attempt_at``."""
+        with self._lock, self._conn as conn:
+            conn.execute(
+                """UPDATE state_transitions
+                   SET delivery_attempts = delivery_attempts + 1, next_attempt_at = ?
+                   WHERE id = ?""",
+                (next_attempt_at, transition_id),
+            )
+
+    def mark_webhook_rejected(self, transition_id: int):
+        """Give up on a webhook the receiver refused; it is never retried."""
+        with self._lock, self._conn as conn:
+            conn.execute(
+                """UPDATE state_transitions
+                   SET delivery_attempts = delivery_attempts + 1, next_attempt_at = ?
+                   WHERE id = ?""",
+                (float("inf"), transition_id),
+            )
+
     def mark_webhook_sent(self, transition_id: int):
         """Mark a transition's webhook as sent."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             conn.execute(
                 "UPDATE state_transitions SET webhook_sent = TRUE WHERE id = ?",
                 (transition_id,),
@@ -102,35 +449,253 @@ class HealthStorage:
         self, hours: int = 24, service_name: Optional[str] = None
     ) -> list[dict]:
         """Get health check history for the last N hours."""
-        query = """SELECT service_name, status, response_time_ms,
-                          details, checked_at
-                   FROM health_checks
-                   WHERE checked_at >= datetime('now', ?)"""
-        params: list = [f"-{hours} hours"]
+        return list(self.iter_history(hours=hours, service_name=service_name))
+
+    def iter_history(
+        self,
+        hours: int = 24,
+        service_name: Optional[str] = None,
+        columns: Sequence[str] = DEFAULT_HISTORY_COLUMNS,
+        page_size: int = 500,
+        decode_details: bool = False,
+    ) -> Iterator[dict]:
+        """Stream health check history for the last N hours, newest first.
+
+        Rows are fetched one keyset page at a time, so memory stays constant
+        regardless of the window and writers are not blocked between pages.
+        """
+        since = self._window_start(hours)
+        cursor = None
+        while True:
+            rows, cursor = self.get_history_page(
+                hours=hours,
+                service_name=service_name,
+                columns=columns,
+                limit=page_size,
+                cursor=cursor,
+                decode_details=decode_details,
+                since=since,
+            )
+            yield from rows
+            if cursor is None:
+                return
+
+    def get_history_page(
+        self,
+        hours: int = 24,
+        service_name: Optional[str] = None,
+        columns: Sequence[str] = DEFAULT_HISTORY_COLUMNS,
+        limit: int = 500,
+        cursor: Optional[tuple[str, int]] = None,
+        decode_details: bool = False,
+        since: Optional[str] = None,
+    ) -> tuple[list[dict], Optional[tuple[str, int]]]:
+        """Get one page of history, newest first.
+
+        ``cursor`` is the (checked_at, id) pair returned by the previous page;
+        the returned cursor is None once the window is exhausted. Only the
+        requested ``columns`` are read, and ``details`` JSON is decoded only
+        when ``decode_details`` is set.
+        """
+        unknown = set(columns) - set(HISTORY_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown history columns: {sorted(unknown)}")
+
+        # The keyset columns are always read; only the requested ones are returned.
+        selected = ", ".join(
+            ["checked_at", "id"] + [c for c in columns if c not in ("checked_at", "id")]
+        )
+        query = f"SELECT {selected} FROM health_checks WHERE checked_at >= ?"
+        params: list = [since or self._window_start(hours)]
+        if service_name:
+            query += " AND service_name = ?"
+            params.append(service_name)
+        if cursor is not None:
+            query += " AND (checked_at, id) < (?, ?)"
+            params.extend(cursor)
+        query += " ORDER BY checked_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            result = self._conn.execute(query, params)
+            names = [c[0] for c in result.description]
+            rows = [dict(zip(names, row)) for row in result]
+
+        next_cursor = (rows[-1]["checked_at"], rows[-1]["id"]) if len(rows) == limit else None
+        page = []
+        for row in rows:
+            if decode_details and row.get("details") is not None:
+                row["details"] = json.loads(row["details"])
+            page.append({column: row[column] for column in columns})
+        return page, next_cursor
+
+    def get_rollups(
+        self,
+        hours: int = 24 * 30,
+        service_name: Optional[str] = None,
+        resolution: Optional[str] = None,
+    ) -> list[dict]:
+        """Get rolled-up history for the last N hours.
+
+        Rollups only hold checks that have been compacted out of
+        health_checks; recent checks are still read with get_history. The
+        resolution defaults to the coarsest one that fits the window.
+        """
+        resolution = resolution or self._select_resolution(hours)
+        query = f"""SELECT service_name, bucket_start, healthy_count,
+                           unhealthy_count, missing_count, total_count,
+                           response_time_min, response_time_avg,
+                           response_time_max, response_time_p95
+                    FROM health_rollup_{resolution}
+                    WHERE bucket_start >= ?"""
+        params: list = [self._bucket_start(self._window_start(hours), resolution)]
         if service_name:
             query += " AND service_name = ?"
             params.append(service_name)
-        query += " ORDER BY checked_at DESC"
+        query += " ORDER BY bucket_start DESC"
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            return [dict(row) for row in conn.execute(query, params)]
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor]
 
     def get_uptime_stats(self, days: int = 7) -> dict[str, float]:
-        """Calculate uptime percentage per service over N days."""
-        with sqlite3.connect(self.db_path) as conn:
-            rows = conn.execute(
-                """
-                SELECT service_name,
-                       SUM(CASE WHEN status = 'healthy' THEN 1 ELSE 0 END) as healthy,
-                       COUNT(*) as total
-                FROM health_checks
-                WHERE checked_at >= datetime('now', ?)
-                GROUP BY service_name
-                """,
-                (f"-{days} days",),
-            ).fetchall()
+        """Calculate uptime percentage per service over N days.
+
+        Reads the hourly uptime_buckets counters, so the cost depends on the
+        window length rather than on how often services are checked.
+        """
+        with self._lock:
+            rows = self._conn.execute(_UPTIME_QUERY, (f"-{days} days",)).fetchall()
             return {
                 row[0]: (row[1] / row[2] * 100) if row[2] > 0 else 0.0
                 for row in rows
             }
+
+    def compact(self, retention_days: int = RAW_RETENTION_DAYS) -> int:
+        """Roll raw checks older than N days up into the rollup tables.
+
+        Works one UTC day at a time; each day's rollups are written and its raw
+        rows deleted in the same transaction, so nothing is counted twice.
+        Rollups and uptime buckets past their retention are then pruned.
+        Returns the number of raw rows compacted.
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).strftime(
+            "%Y-%m-%d 00:00:00"
+        )
+        compacted = 0
+        while True:
+            with self._lock, self._conn as conn:
+                oldest = conn.execute(
+                    "SELECT MIN(checked_at) FROM health_checks WHERE checked_at < ?",
+                    (cutoff,),
+                ).fetchone()[0]
+                if oldest is None:
+                    break
+                day_start = self._bucket_start(oldest, "day")
+                day_end = (
+                    datetime.strptime(day_start, "%Y-%m-%d %H:%M:%S") + timedelta(days=1)
+                ).strftime("%Y-%m-%d %H:%M:%S")
+                rows = conn.execute(
+                    """SELECT service_name, status, response_time_ms, checked_at
+                       FROM health_checks
+                       WHERE checked_at >= ? AND checked_at < ?""",
+                    (day_start, day_end),
+                ).fetchall()
+                self._write_rollups(conn, rows)
+                conn.execute(
+                    "DELETE FROM health_checks WHERE checked_at >= ? AND checked_at < ?",
+                    (day_start, day_end),
+                )
+                compacted += len(rows)
+
+        with self._lock, self._conn as conn:
+            for resolution, keep_days in ROLLUP_RETENTION_DAYS.items():
+                if keep_days is not None:
+                    conn.execute(
+                        f"DELETE FROM health_rollup_{resolution} WHERE bucket_start < datetime('now', ?)",
+                        (f"-{keep_days} days",),
+                    )
+            conn.execute(
+                "DELETE FROM uptime_buckets WHERE bucket_start < datetime('now', ?)",
+                (f"-{UPTIME_RETENTION_DAYS} days",),
+            )
+        return compacted
+
+    def _write_rollups(self, conn: sqlite3.Connection, rows: list[tuple]):
+        for resolution in ROLLUP_BUCKETS:
+            buckets: dict[tuple[str, str], tuple[dict, list]] = {}
+            for service_name, status, response_time_ms, checked_at in rows:
+                key = (service_name, self._bucket_start(checked_at, resolution))
+                counts, times = buckets.setdefault(key, ({}, []))
+                counts[status] = counts.get(status, 0) + 1
+                if response_time_ms is not None:
+                    times.append(response_time_ms)
+
+            params = []
+            for (service_name, bucket_start), (counts, times) in buckets.items():
+                times.sort()
+                params.append((
+                    service_name,
+                    bucket_start,
+                    counts.get("healthy", 0),
+                    counts.get("unhealthy", 0),
+                    counts.get("missing", 0),
+                    sum(counts.values()),
+                    times[0] if times else None,
+                    sum(times) / len(times) if times else None,
+                    times[-1] if times else None,
+                    _percentile(times, 95) if times else None,
+                ))
+
+            # Merging into an existing bucket keeps counts exact; the average is
+            # weighted by count and p95 falls back to the larger of the two.
+            conn.executemany(
+                f"""INSERT INTO health_rollup_{resolution}
+                    (service_name, bucket_start, healthy_count, unhealthy_count,
+                     missing_count, total_count, response_time_min,
+                     response_time_avg, response_time_max, response_time_p95)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (service_name, bucket_start) DO UPDATE SET
+                        healthy_count = healthy_count + excluded.healthy_count,
+                        unhealthy_count = unhealthy_count + excluded.unhealthy_count,
+                        missing_count = missing_count + excluded.missing_count,
+                        total_count = total_count + excluded.total_count,
+                        response_time_min = COALESCE(
+                            MIN(response_time_min, excluded.response_time_min),
+                            response_time_min, excluded.response_time_min),
+                        response_time_avg = COALESCE(
+                            (response_time_avg * total_count
+                             + excluded.response_time_avg * excluded.total_count)
+                            / (total_count + excluded.total_count),
+                            response_time_avg, excluded.response_time_avg),
+                        response_time_max = COALESCE(
+                            MAX(response_time_max, excluded.response_time_max),
+                            response_time_max, excluded.response_time_max),
+                        response_time_p95 = COALESCE(
+                            MAX(response_time_p95, excluded.response_time_p95),
+                            response_time_p95, excluded.response_time_p95)""",
+                params,
+            )
+
+    @staticmethod
+    def _select_resolution(hours: float) -> str:
+        """Coarsest rollup resolution no wider than the window that still covers it."""
+        for resolution in ("day", "hour", "minute"):
+            keep_days = ROLLUP_RETENTION_DAYS[resolution]
+            if ROLLUP_WIDTH_HOURS[resolution] <= hours and (
+                keep_days is None or keep_days * 24 >= hours
+            ):
+                return resolution
+        return "minute"
+
+    @staticmethod
+    def _window_start(hours: float) -> str:
+        return (datetime.now(timezone.utc) - timedelta(hours=hours)).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+
+    @staticmethod
+    def _bucket_start(timestamp: str, resolution: str) -> str:
+        prefix, suffix = ROLLUP_BUCKETS[resolution]
+        return timestamp[:prefix] + suffix
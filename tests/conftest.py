@@ -14,4 +14,6 @@ def temp_db(tmp_path):
     from health_storage import HealthStorage
 
     db_path = tmp_path / "test_health.sqlite"
-    return HealthStorage(db_path)
+    storage = HealthStorage(db_path)
+    yield storage
+    storage.close()
@@ -1,17 +1,28 @@
 """Tests for health_alerter.py - Consecutive failure alerting with notification history."""
 
+import asyncio
+import dataclasses
+import time
 from datetime import datetime, timezone
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from health_checker import HealthResult, HealthStatus
 from health_alerter import (
     Alert,
     AlertChannel,
+    AsyncAlertChannel,
+    AsyncWebhookAlertChannel,
+    CoalescingAlertChannel,
     ConsecutiveFailureTracker,
     ConsoleAlertChannel,
     HealthAlerter,
     NotificationHistory,
+    SyncChannelAdapter,
     WebhookAlertChannel,
+    as_async_channel,
+    is_async_channel,
 )
 
 
@@ -77,6 +88,13 @@ class TestAlertDataclass:
 
         assert alert.latest_details is None
 
+    def test_alert_is_slotted_and_frozen(self):
+        alert = _make_alert()
+
+        assert not hasattr(alert, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            alert.threshold = 5
+
     def test_alert_is_dataclass(self):
         # dataclasses support equality comparison
         ts = datetime.now(timezone.utc)
@@ -233,6 +251,14 @@ class TestConsecutiveFailureTracker:
 
         assert tracker.get_count("redis") == 1
 
+    def test_seed_resumes_streak(self):
+        tracker = ConsecutiveFailureTracker(threshold=3)
+        tracker.seed({"postiz": 2, "redis": 0})
+
+        assert tracker.record(_unhealthy("postiz")) is True
+        assert tracker.get_count("postiz") == 3
+        assert tracker.get_count("redis") == 0
+
     def test_threshold_one_alerts_on_first_failure(self):
         tracker = ConsecutiveFailureTracker(threshold=1)
 
@@ -497,6 +523,57 @@ class TestWebhookAlertChannel:
 
         assert mock_client.post.call_count == 1
 
+    @patch("health_alerter.httpx")
+    def test_send_uses_injected_client(self, mock_httpx):
+        shared = MagicMock()
+        shared.post.return_value = MagicMock(status_code=200)
+
+        channel = WebhookAlertChannel(url="https://n8n.example.com/webhook/alert", client=shared)
+        channel.send(_make_alert())
+        channel.send(_make_alert())
+
+        assert shared.post.call_count == 2
+        mock_httpx.Client.assert_not_called()
+
+    @patch("health_alerter.time")
+    @patch("health_alerter.httpx")
+    def test_open_circuit_skips_delivery(self, mock_httpx, mock_time):
+        from health_http import CircuitBreaker
+
+        mock_httpx.RequestError = Exception
+        client = MagicMock()
+        client.post.side_effect = Exception("connection refused")
+        breaker = CircuitBreaker(failure_rate=0.5, window=4, min_calls=2, cooldown=60)
+        channel = WebhookAlertChannel(url="http://hooks/alert", client=client, breaker=breaker)
+
+        channel.send(_make_alert())
+        assert breaker.state == CircuitBreaker.OPEN
+        assert client.post.call_count == 2
+
+        channel.send(_make_alert())
+        assert client.post.call_count == 2
+
+    def test_unexpected_error_releases_half_open_trial(self):
+        from health_http import CircuitBreaker
+
+        now = [0.0]
+        breaker = CircuitBreaker(min_calls=1, cooldown=30, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 31.0
+        client = MagicMock()
+        client.post.side_effect = RuntimeError("client has been closed")
+        channel = WebhookAlertChannel(url="http://hooks/alert", client=client, breaker=breaker)
+
+        with pytest.raises(RuntimeError):
+            channel.send(_make_alert())
+
+        assert breaker.state == CircuitBreaker.OPEN
+        now[0] = 62.0
+        client.post.side_effect = None
+        client.post.return_value = MagicMock(status_code=200)
+        channel.send(_make_alert())
+        assert breaker.state == CircuitBreaker.CLOSED
+
     def test_satisfies_alert_channel_protocol(self):
         channel = WebhookAlertChannel(url="https://n8n.example.com/webhook/alert")
 
@@ -634,6 +711,60 @@ class TestNotificationHistory:
         # The minimum requirement is it returns >= current stored count.
         assert history.total_count() >= 2
 
+    def test_indexes_follow_eviction(self):
+        history = NotificationHistory(max_size=3)
+        healthy = dataclasses.replace(_make_alert(service="redis"), latest_status=HealthStatus.HEALTHY)
+        history.record(_make_alert(service="postiz"))
+        history.record(healthy)
+        history.record(_make_alert(service="postiz"))
+        history.record(_make_alert(service="temporal"))  # evicts the first postiz alert
+
+        assert len(history.get_for_service("postiz")) == 1
+        assert [a.service_name for a in history.get_failures()] == ["postiz", "temporal"]
+
+        history.record(_make_alert(service="postiz"))  # evicts the healthy redis alert
+        history.record(_make_alert(service="postiz"))
+
+        assert history.get_for_service("redis") == []
+        assert len(history.get_failures()) == 3
+        assert "redis" not in history._by_service
+
+    def test_compact_mode_round_trips_alert_fields(self):
+        history = NotificationHistory(max_size=10, compact=True)
+        alert = Alert(
+            service_name="postiz",
+            consecutive_failures=7,
+            threshold=3,
+            latest_status=HealthStatus.MISSING,
+            latest_details={"error": "gone"},
+            timestamp=datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+        )
+        history.record(alert)
+
+        (restored,) = history.get_recent()
+
+        assert restored == dataclasses.replace(alert, latest_details=None)
+
+    def test_compact_mode_evicts_like_default_mode(self):
+        default = NotificationHistory(max_size=3)
+        compact = NotificationHistory(max_size=3, compact=True)
+        for service in ["a", "b", "a", "c", "a"]:
+            default.record(_make_alert(service=service))
+            compact.record(_make_alert(service=service))
+
+        for history in (default, compact):
+            assert [a.service_name for a in history.get_recent()] == ["a", "c", "a"]
+            assert len(history.get_for_service("a")) == 2
+            assert history.get_for_service("b") == []
+            assert len(history.get_failures()) == 3
+
+    def test_get_recent_returns_newest_first_without_full_copy(self):
+        history = NotificationHistory(max_size=100)
+        for i in range(10):
+            history.record(_make_alert(service=f"svc-{i}"))
+
+        assert [a.service_name for a in history.get_recent(n=3)] == ["svc-9", "svc-8", "svc-7"]
+
 
 # ---------------------------------------------------------------------------
 # TestHealthAlerter
@@ -845,3 +976,343 @@ class TestHealthAlerter:
         assert len(recent) == 2, (
             f"History should cap at max_size=2, got {len(recent)} entries"
         )
+
+
+# ---------------------------------------------------------------------------
+# TestCoalescingAlertChannel
+# ---------------------------------------------------------------------------
+
+class TestCoalescingAlertChannel:
+    def test_alerts_within_window_sent_as_one_batch(self):
+        inner = MagicMock()
+        channel = CoalescingAlertChannel(inner, window=60)
+
+        channel.send(_make_alert("postiz-postgres"))
+        channel.send(_make_alert("postiz"))
+        inner.send_batch.assert_not_called()
+        channel.flush()
+
+        inner.send_batch.assert_called_once()
+        batch = inner.send_batch.call_args[0][0]
+        assert [a.service_name for a in batch] == ["postiz-postgres", "postiz"]
+
+    def test_falls_back_to_send_without_send_batch(self):
+        inner = MagicMock(spec=AlertChannel)
+        channel = CoalescingAlertChannel(inner, window=60)
+
+        channel.send(_make_alert("postiz"))
+        channel.send(_make_alert("redis"))
+        channel.flush()
+
+        assert inner.send.call_count == 2
+
+    def test_timer_flushes_after_window(self):
+        import threading
+
+        flushed = threading.Event()
+        inner = MagicMock()
+        inner.send_batch.side_effect = lambda alerts: flushed.set()
+        channel = CoalescingAlertChannel(inner, window=0.05)
+
+        channel.send(_make_alert())
+
+        assert flushed.wait(2)
+
+    @patch("health_alerter.httpx")
+    def test_webhook_batch_payload(self, mock_httpx):
+        shared = MagicMock()
+        shared.post.return_value = MagicMock(status_code=200)
+        channel = WebhookAlertChannel(url="https://n8n.example.com/webhook/alert", client=shared)
+
+        channel.send_batch([_make_alert("postiz"), _make_alert("temporal")])
+
+        shared.post.assert_called_once()
+        payload = shared.post.call_args.kwargs["json"]
+        assert payload["event"] == "consecutive_failure_alert_batch"
+        assert [a["service"] for a in payload["alerts"]] == ["postiz", "temporal"]
+
+    def test_async_channel_awaited_on_flush(self):
+        sent = []
+
+        class AsyncChannel:
+            async def send(self, alert):
+                sent.append(alert.service_name)
+
+        alerter = HealthAlerter(channels=[AsyncChannel()], threshold=1, coalesce_window=60)
+
+        alerter.process_result(_unhealthy("postiz"))
+        alerter.flush()
+
+        assert sent == ["postiz"]
+
+    def test_async_webhook_batch_awaited_on_flush(self):
+        client = MagicMock()
+
+        async def post(url, json, timeout):
+            return MagicMock(status_code=200)
+
+        client.post = MagicMock(side_effect=post)
+        channel = CoalescingAlertChannel(
+            AsyncWebhookAlertChannel(url="http://hooks/alert", client=client), window=60
+        )
+
+        channel.send(_make_alert("postiz"))
+        channel.send(_make_alert("temporal"))
+        channel.flush()
+
+        client.post.assert_called_once()
+        assert client.post.call_args.kwargs["json"]["event"] == "consecutive_failure_alert_batch"
+
+    def test_alerter_wraps_channels_and_flushes(self):
+        inner = MagicMock()
+        alerter = HealthAlerter(channels=[inner], threshold=1, coalesce_window=60)
+
+        alerter.process_result(_unhealthy("postiz"))
+        alerter.process_result(_unhealthy("temporal"))
+        alerter.flush()
+
+        inner.send_batch.assert_called_once()
+        assert len(inner.send_batch.call_args[0][0]) == 2
+
+
+# ---------------------------------------------------------------------------
+# TestParallelDispatch
+# ---------------------------------------------------------------------------
+
+class TestParallelDispatch:
+    def test_slow_channel_does_not_delay_others(self):
+        import threading
+
+        release = threading.Event()
+        fast_done = threading.Event()
+
+        class SlowChannel:
+            def send(self, alert):
+                release.wait(5)
+
+        class FastChannel:
+            def send(self, alert):
+                fast_done.set()
+
+        alerter = HealthAlerter(channels=[SlowChannel(), FastChannel()], threshold=1, channel_timeout=0.2)
+        try:
+            start = time.monotonic()
+            alert = alerter.process_result(_unhealthy("postiz"))
+            elapsed = time.monotonic() - start
+        finally:
+            release.set()
+            alerter.close()
+
+        assert alert is not None
+        assert fast_done.is_set()
+        assert elapsed < 2
+
+    def test_channels_run_concurrently(self):
+        import threading
+
+        barrier = threading.Barrier(2, timeout=2)
+
+        class BarrierChannel:
+            def __init__(self):
+                self.sent = False
+
+            def send(self, alert):
+                barrier.wait()
+                self.sent = True
+
+        a, b = BarrierChannel(), BarrierChannel()
+        alerter = HealthAlerter(channels=[a, b], threshold=1)
+
+        alerter.process_result(_unhealthy("postiz"))
+        alerter.close()
+
+        assert a.sent and b.sent
+
+
+# ---------------------------------------------------------------------------
+# TestAsyncAlerting
+# ---------------------------------------------------------------------------
+
+class RecordingAsyncChannel:
+    def __init__(self):
+        self.alerts = []
+
+    async def send(self, alert):
+        self.alerts.append(alert)
+
+
+class TestAsyncAlerting:
+    def test_async_channel_detected(self):
+        channel = RecordingAsyncChannel()
+        assert isinstance(channel, AsyncAlertChannel)
+        assert is_async_channel(channel)
+        assert not is_async_channel(ConsoleAlertChannel())
+
+    def test_sync_channel_wrapped_in_adapter(self):
+        sync = MagicMock()
+        sync.send = MagicMock()
+
+        adapted = as_async_channel(sync)
+        asyncio.run(adapted.send(_make_alert()))
+
+        assert isinstance(adapted, SyncChannelAdapter)
+        sync.send.assert_called_once()
+
+    def test_async_channel_passed_through(self):
+        channel = RecordingAsyncChannel()
+        assert as_async_channel(channel) is channel
+
+    def test_process_result_async_fans_out_to_mixed_channels(self):
+        async_channel = RecordingAsyncChannel()
+        sync_channel = MagicMock()
+        alerter = HealthAlerter(channels=[async_channel, sync_channel], threshold=1)
+
+        try:
+            alert = asyncio.run(alerter.process_result_async(_unhealthy("postiz")))
+        finally:
+            alerter.close()
+
+        assert alert is not None
+        assert async_channel.alerts == [alert]
+        sync_channel.send.assert_called_once_with(alert)
+        assert alerter.history.total_count() == 1
+
+    def test_process_result_async_below_threshold_returns_none(self):
+        channel = RecordingAsyncChannel()
+        alerter = HealthAlerter(channels=[channel], threshold=2)
+
+        assert asyncio.run(alerter.process_result_async(_unhealthy("postiz"))) is None
+        assert channel.alerts == []
+
+    def test_slow_or_failing_async_channel_isolated(self):
+        class SlowChannel:
+            async def send(self, alert):
+                await asyncio.sleep(5)
+
+        class BrokenChannel:
+            async def send(self, alert):
+                raise RuntimeError("boom")
+
+        good = RecordingAsyncChannel()
+        alerter = HealthAlerter(
+            channels=[SlowChannel(), BrokenChannel(), good], threshold=1, channel_timeout=0.1
+        )
+
+        start = time.monotonic()
+        alert = asyncio.run(alerter.process_result_async(_unhealthy("postiz")))
+
+        assert time.monotonic() - start < 2
+        assert good.alerts == [alert]
+
+    def test_async_channel_usable_from_sync_process_result(self):
+        channel = RecordingAsyncChannel()
+        alerter = HealthAlerter(channels=[channel], threshold=1)
+
+        try:
+            alert = alerter.process_result(_unhealthy("postiz"))
+        finally:
+            alerter.close()
+
+        assert channel.alerts == [alert]
+
+
+class TestAsyncWebhookAlertChannel:
+    def test_send_posts_payload_with_injected_client(self):
+        client = MagicMock()
+        response = MagicMock(status_code=200)
+
+        async def post(url, json, timeout):
+            return response
+
+        client.post = MagicMock(side_effect=post)
+        channel = AsyncWebhookAlertChannel(url="http://hooks/alert", client=client)
+
+        asyncio.run(channel.send(_make_alert("postiz")))
+
+        client.post.assert_called_once()
+        assert client.post.call_args.kwargs["json"]["service"] == "postiz"
+
+    @patch("health_alerter.asyncio.sleep")
+    def test_send_retries_without_blocking(self, mock_sleep):
+        import httpx
+
+        calls = []
+
+        async def no_sleep(delay):
+            calls.append(delay)
+
+        mock_sleep.side_effect = no_sleep
+        client = MagicMock()
+
+        async def post(url, json, timeout):
+            raise httpx.ConnectError("down")
+
+        client.post = MagicMock(side_effect=post)
+        channel = AsyncWebhookAlertChannel(url="http://hooks/alert", client=client)
+
+        asyncio.run(channel.send(_make_alert()))
+
+        assert client.post.call_count == 3
+        assert calls == [1, 2]
+
+    def test_shared_client_survives_sync_dispatch(self):
+        import threading
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+
+        import httpx
+
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                received.append(self.rfile.read(int(self.headers["Content-Length"])))
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        client = httpx.AsyncClient()
+        channel = AsyncWebhookAlertChannel(
+            url=f"http://127.0.0.1:{server.server_port}/alert", client=client
+        )
+        alerter = HealthAlerter(channels=[channel], threshold=1)
+        try:
+            for _ in range(3):
+                alerter.process_result(_unhealthy("postiz"))
+        finally:
+            alerter.close()
+            server.shutdown()
+            server.server_close()
+
+        assert len(received) == 3
+
+    def test_open_circuit_skips_delivery(self):
+        from health_http import CircuitBreaker
+
+        breaker = CircuitBreaker(min_calls=1, cooldown=60)
+        breaker.record_failure()
+        client = MagicMock()
+        channel = AsyncWebhookAlertChannel(url="http://hooks/alert", client=client, breaker=breaker)
+
+        asyncio.run(channel.send(_make_alert()))
+
+        client.post.assert_not_called()
+
+
+class TestAlerterMetrics:
+    def test_alerts_counted(self):
+        from health_metrics import HealthMetrics
+
+        metrics = HealthMetrics()
+        alerter = HealthAlerter(channels=[], threshold=2, metrics=metrics)
+
+        alerter.process_result(_unhealthy("postiz"))
+        alerter.process_result(_unhealthy("postiz"))
+
+        assert 'health_alerts_total{service="postiz"} 1' in metrics.render()
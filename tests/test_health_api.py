@@ -0,0 +1,164 @@
+"""Tests for health_api.py - Local query API for the resident monitor."""
+
+import importlib
+import json
+import time
+import urllib.request
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import health_api
+from health_alerter import Alert, NotificationHistory
+from health_api import (
+    HealthAPIServer,
+    HealthAPITCPServer,
+    LatestResults,
+    MonitorState,
+    fetch_json,
+)
+from health_checker import HealthResult, HealthStatus
+
+
+@pytest.fixture
+def api_server(tmp_path):
+    server = HealthAPIServer(str(tmp_path / "health.sock"), MonitorState()).start()
+    yield server
+    server.close()
+
+
+class TestLatestResults:
+    def test_keeps_newest_result_per_service(self):
+        latest = LatestResults()
+        latest.update([HealthResult("postiz", HealthStatus.HEALTHY, 10)])
+        latest.update([HealthResult("postiz", HealthStatus.UNHEALTHY, 20, {"error": "down"})])
+
+        (entry,) = latest.snapshot()
+
+        assert entry["status"] == "unhealthy"
+        assert entry["details"] == {"error": "down"}
+        assert entry["checked_at"] <= time.time()
+
+
+class TestMonitorState:
+    def test_records_transitions_newest_first(self):
+        seeded = [
+            {"id": 1, "service_name": "redis", "from_status": "healthy", "to_status": "unhealthy"}
+        ]
+        state = MonitorState(statuses={"postiz": "healthy"}, transitions=seeded)
+
+        state.record(
+            [
+                HealthResult("postiz", HealthStatus.UNHEALTHY, 5),
+                HealthResult("redis", HealthStatus.UNHEALTHY, 5),
+            ],
+            [7, None],
+        )
+
+        transitions = state.transitions({})
+        assert [t["id"] for t in transitions] == [7, 1]
+        assert transitions[0]["from_status"] == "healthy"
+        assert transitions[0]["to_status"] == "unhealthy"
+        assert state.transitions({"limit": ["1"]}) == transitions[:1]
+
+    def test_alerts_served_from_history(self):
+        history = NotificationHistory(max_size=10)
+        history.record(Alert("postiz", 3, 3, HealthStatus.UNHEALTHY))
+        history.record(Alert("redis", 4, 3, HealthStatus.MISSING))
+
+        alerts = MonitorState(history=history).alerts({"limit": ["1"]})
+
+        assert [(a["service"], a["status"]) for a in alerts] == [("redis", "missing")]
+
+    def test_uptime_cached_between_requests(self):
+        uptime = MagicMock(return_value={"postiz": 99.5})
+        now = [0.0]
+        state = MonitorState(uptime=uptime, uptime_ttl=60, clock=lambda: now[0])
+
+        assert state.uptime({}) == {"postiz": 99.5}
+        state.uptime({})
+        now[0] = 61
+        state.uptime({})
+
+        assert uptime.call_count == 2
+        uptime.assert_called_with(7)
+
+
+class TestHealthAPIServer:
+    def test_status_round_trip(self, api_server):
+        api_server.state.latest.update([HealthResult("postiz", HealthStatus.HEALTHY, 12)])
+
+        status = fetch_json(api_server.socket_path, "/status")
+
+        assert [(s["service"], s["status"]) for s in status] == [("postiz", "healthy")]
+
+    def test_all_routes_answer(self, api_server):
+        for path in ("/status", "/transitions?limit=5", "/alerts", "/uptime?days=1"):
+            assert fetch_json(api_server.socket_path, path) is not None
+
+    def test_metrics_served_as_openmetrics(self, tmp_path):
+        import http.client
+
+        from health_api import _UnixHTTPConnection
+        from health_metrics import HealthMetrics
+
+        metrics = HealthMetrics()
+        metrics.observe_results([HealthResult("postiz", HealthStatus.HEALTHY, 12)])
+        state = MonitorState(metrics=metrics)
+        server = HealthAPIServer(str(tmp_path / "health.sock"), state).start()
+        conn = _UnixHTTPConnection(server.socket_path, timeout=2)
+        try:
+            conn.request("GET", "/metrics")
+            resp = conn.getresponse()
+            body = resp.read().decode()
+        finally:
+            conn.close()
+            server.close()
+
+        assert resp.getheader("Content-Type").startswith("application/openmetrics-text")
+        assert 'health_service_up{service="postiz"} 1' in body
+        assert body.endswith("# EOF\n")
+
+    def test_unknown_path_returns_none(self, api_server):
+        assert fetch_json(api_server.socket_path, "/nope") is None
+
+    @patch("health_api._UnixHTTPConnection")
+    def test_error_response_body_is_read(self, MockConnection):
+        resp = MockConnection.return_value.getresponse.return_value
+        resp.status = 404
+
+        assert fetch_json("/run/health.sock", "/nope") is None
+        resp.read.assert_called_once()
+
+    def test_close_removes_socket(self, tmp_path):
+        server = HealthAPIServer(str(tmp_path / "health.sock"), MonitorState()).start()
+        server.close()
+
+        assert not (tmp_path / "health.sock").exists()
+
+    def test_fetch_without_server_returns_none(self, tmp_path):
+        assert fetch_json(str(tmp_path / "missing.sock"), "/status") is None
+
+
+class TestHealthAPITCPServer:
+    def test_serves_over_loopback_http(self):
+        state = MonitorState()
+        state.latest.update([HealthResult("postiz", HealthStatus.HEALTHY, 12)])
+        server = HealthAPITCPServer(0, state).start()
+        try:
+            host, port = server.server_address
+            with urllib.request.urlopen(f"http://{host}:{port}/status", timeout=2) as resp:
+                body = json.loads(resp.read())
+        finally:
+            server.close()
+
+        assert body[0]["service"] == "postiz"
+
+
+class TestConfig:
+    def test_empty_port_disables_tcp(self):
+        # .env.example ships HEALTH_API_PORT= and docker-compose loads it as-is.
+        with patch.dict("os.environ", {"HEALTH_API_PORT": ""}):
+            importlib.reload(health_api)
+            assert health_api.API_PORT == 0
+        importlib.reload(health_api)
@@ -33,6 +33,17 @@ class TestHealthResult:
         )
         assert result.details is None
 
+    def test_slotted_and_frozen(self):
+        import dataclasses
+
+        import pytest
+
+        result = HealthResult("redis", HealthStatus.HEALTHY, 10)
+
+        assert not hasattr(result, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            result.status = HealthStatus.UNHEALTHY
+
 
 class TestServiceContainers:
     def test_all_seven_services_defined(self):
@@ -196,3 +207,220 @@ class TestCheckAllServices:
         assert all(isinstance(r, HealthResult) for r in results)
         service_names = {r.service_name for r in results}
         assert service_names == set(SERVICE_CONTAINERS.keys())
+
+    @patch("health_checker.docker")
+    def test_sweep_duration_reported_to_metrics(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.from_env.return_value = mock_client
+        mock_docker.errors.DockerException = Exception
+        mock_docker.errors.NotFound = type("NotFound", (Exception,), {})
+        mock_docker.errors.APIError = type("APIError", (Exception,), {})
+        mock_client.containers.get.return_value = MagicMock(
+            status="running", attrs={"State": {"Health": {"Status": "healthy"}}}
+        )
+        metrics = MagicMock()
+
+        HealthChecker(metrics=metrics).check_all_services()
+
+        metrics.observe_sweep.assert_called_once()
+
+    @patch("health_checker.docker")
+    def test_check_services_probes_only_the_subset(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.from_env.return_value = mock_client
+        mock_docker.errors.DockerException = Exception
+        mock_docker.errors.NotFound = type("NotFound", (Exception,), {})
+        mock_docker.errors.APIError = type("APIError", (Exception,), {})
+
+        mock_container = MagicMock()
+        mock_container.status = "running"
+        mock_container.attrs = {"State": {"Health": {"Status": "healthy"}}}
+        mock_client.containers.get.return_value = mock_container
+
+        checker = HealthChecker()
+        results = checker.check_services(["temporal-ui", "postiz"])
+
+        assert [r.service_name for r in results] == ["temporal-ui", "postiz"]
+        assert mock_client.containers.get.call_count == 2
+
+
+class TestCheckAllServicesConcurrent:
+    @patch("health_checker.docker")
+    def test_concurrent_results_keep_service_order(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.from_env.return_value = mock_client
+        mock_docker.errors.DockerException = Exception
+        mock_docker.errors.NotFound = type("NotFound", (Exception,), {})
+        mock_docker.errors.APIError = type("APIError", (Exception,), {})
+
+        mock_container = MagicMock()
+        mock_container.status = "running"
+        mock_container.attrs = {"State": {"Health": {"Status": "healthy"}}}
+        mock_client.containers.get.return_value = mock_container
+
+        checker = HealthChecker(max_workers=4)
+        results = checker.check_all_services()
+
+        assert [r.service_name for r in results] == list(SERVICE_CONTAINERS.keys())
+        assert all(r.status == HealthStatus.HEALTHY for r in results)
+        assert mock_client.containers.get.call_count == 7
+
+    @patch("health_checker.docker")
+    def test_slow_service_times_out_as_unhealthy(self, mock_docker):
+        import threading
+
+        mock_client = MagicMock()
+        mock_docker.from_env.return_value = mock_client
+        mock_docker.errors.DockerException = Exception
+        mock_docker.errors.NotFound = type("NotFound", (Exception,), {})
+        mock_docker.errors.APIError = type("APIError", (Exception,), {})
+
+        release = threading.Event()
+        healthy = MagicMock()
+        healthy.status = "running"
+        healthy.attrs = {"State": {"Health": {"Status": "healthy"}}}
+
+        def get(name):
+            if name == "postiz-temporal":
+                release.wait(5)
+            return healthy
+
+        mock_client.containers.get.side_effect = get
+
+        checker = HealthChecker(max_workers=7, timeout=0.2)
+        try:
+            results = checker.check_all_services()
+        finally:
+            release.set()
+
+        by_name = {r.service_name: r for r in results}
+        assert by_name["temporal"].status == HealthStatus.UNHEALTHY
+        assert "timed out" in by_name["temporal"].details["error"]
+        assert by_name["postiz"].status == HealthStatus.HEALTHY
+
+
+class TestCheckAllServicesBulk:
+    def _checker(self, mock_docker, listing):
+        mock_client = MagicMock()
+        mock_docker.from_env.return_value = mock_client
+        mock_docker.errors.DockerException = Exception
+        mock_docker.errors.NotFound = type("NotFound", (Exception,), {})
+        mock_docker.errors.APIError = type("APIError", (Exception,), {})
+        mock_client.api.containers.return_value = listing
+        return HealthChecker(bulk=True), mock_client
+
+    @patch("health_checker.docker")
+    def test_single_listing_call_for_all_services(self, mock_docker):
+        listing = [
+            {"Names": [f"/{name}"], "State": "running", "Status": "Up 2 hours (healthy)"}
+            for name in SERVICE_CONTAINERS.values()
+        ]
+        checker, mock_client = self._checker(mock_docker, listing)
+
+        results = checker.check_all_services()
+
+        mock_client.api.containers.assert_called_once()
+        mock_client.containers.get.assert_not_called()
+        assert [r.service_name for r in results] == list(SERVICE_CONTAINERS.keys())
+        assert all(r.status == HealthStatus.HEALTHY for r in results)
+
+    @patch("health_checker.docker")
+    def test_missing_and_stopped_containers(self, mock_docker):
+        listing = [
+            {"Names": ["/postiz"], "State": "exited", "Status": "Exited (1) 5 seconds ago"},
+            {"Names": ["/postiz-redis"], "State": "running", "Status": "Up 1 minute"},
+        ]
+        checker, _ = self._checker(mock_docker, listing)
+
+        by_name = {r.service_name: r for r in checker.check_all_services()}
+
+        assert by_name["postiz"].status == HealthStatus.UNHEALTHY
+        assert "not running" in by_name["postiz"].details["error"].lower()
+        assert by_name["postiz-redis"].status == HealthStatus.HEALTHY
+        assert by_name["postiz-redis"].details["docker_health"] == "none"
+        assert by_name["temporal"].status == HealthStatus.MISSING
+
+    @patch("health_checker.docker")
+    def test_unhealthy_falls_back_to_inspect_for_log(self, mock_docker):
+        listing = [
+            {"Names": ["/postiz"], "State": "running", "Status": "Up 1 minute (unhealthy)"},
+        ]
+        checker, mock_client = self._checker(mock_docker, listing)
+        mock_container = MagicMock()
+        mock_container.status = "running"
+        mock_container.attrs = {
+            "State": {"Health": {"Status": "unhealthy", "Log": [{"Output": "connection refused"}]}}
+        }
+        mock_client.containers.get.return_value = mock_container
+
+        by_name = {r.service_name: r for r in checker.check_all_services()}
+
+        mock_client.containers.get.assert_called_once_with("postiz")
+        assert by_name["postiz"].status == HealthStatus.UNHEALTHY
+        assert by_name["postiz"].details["last_output"] == "connection refused"
+
+
+class TestEvents:
+    def _checker(self, mock_docker):
+        mock_client = MagicMock()
+        mock_docker.from_env.return_value = mock_client
+        mock_docker.errors.DockerException = Exception
+        mock_docker.errors.NotFound = type("NotFound", (Exception,), {})
+        mock_docker.errors.APIError = type("APIError", (Exception,), {})
+        return HealthChecker(), mock_client
+
+    @staticmethod
+    def _event(action, name="postiz-temporal", **attributes):
+        return {"Type": "container", "Action": action, "Actor": {"Attributes": {"name": name, **attributes}}}
+
+    @patch("health_checker.docker")
+    def test_health_status_event_maps_to_service(self, mock_docker):
+        checker, mock_client = self._checker(mock_docker)
+
+        result = checker.result_from_event(self._event("health_status: healthy"))
+
+        assert result.service_name == "temporal"
+        assert result.status == HealthStatus.HEALTHY
+        mock_client.containers.get.assert_not_called()
+
+    @patch("health_checker.docker")
+    def test_die_event_is_unhealthy(self, mock_docker):
+        checker, _ = self._checker(mock_docker)
+
+        result = checker.result_from_event(self._event("die", exitCode="137"))
+
+        assert result.status == HealthStatus.UNHEALTHY
+        assert "137" in result.details["error"]
+
+    @patch("health_checker.docker")
+    def test_start_event_inspects_container(self, mock_docker):
+        checker, mock_client = self._checker(mock_docker)
+        mock_container = MagicMock()
+        mock_container.status = "running"
+        mock_container.attrs = {"State": {"Health": {"Status": "healthy"}}}
+        mock_client.containers.get.return_value = mock_container
+
+        result = checker.result_from_event(self._event("start"))
+
+        mock_client.containers.get.assert_called_once_with("postiz-temporal")
+        assert result.status == HealthStatus.HEALTHY
+
+    @patch("health_checker.docker")
+    def test_unknown_container_ignored(self, mock_docker):
+        checker, _ = self._checker(mock_docker)
+
+        assert checker.result_from_event(self._event("die", name="something-else")) is None
+
+    @patch("health_checker.docker")
+    def test_watch_events_yields_results(self, mock_docker):
+        checker, mock_client = self._checker(mock_docker)
+        mock_client.events.return_value = iter([
+            self._event("oom", name="postiz"),
+            self._event("die", name="unrelated"),
+        ])
+
+        results = list(checker.watch_events(since=1, until=2))
+
+        assert [r.service_name for r in results] == ["postiz"]
+        filters = mock_client.events.call_args.kwargs["filters"]
+        assert set(filters["event"]) == {"health_status", "die", "start", "oom"}
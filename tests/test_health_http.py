@@ -0,0 +1,127 @@
+"""Tests for health_http.py - Shared pooled HTTP client."""
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+
+from health_http import (
+    CircuitBreaker,
+    create_async_http_client,
+    create_http_client,
+    http2_available,
+)
+
+
+class TestCreateHttpClient:
+    def test_returns_httpx_client(self):
+        client = create_http_client(http2=False)
+        try:
+            assert isinstance(client, httpx.Client)
+        finally:
+            client.close()
+
+    def test_http2_follows_h2_availability(self):
+        with patch("health_http.httpx") as mock_httpx, patch(
+            "health_http.http2_available", return_value=False
+        ):
+            create_http_client()
+
+        assert mock_httpx.Client.call_args.kwargs["http2"] is False
+
+    def test_pool_limits_applied(self):
+        with patch("health_http.httpx") as mock_httpx:
+            create_http_client(max_connections=3, max_keepalive=2, http2=False)
+
+        mock_httpx.Limits.assert_called_once()
+        limits = mock_httpx.Limits.call_args.kwargs
+        assert limits["max_connections"] == 3
+        assert limits["max_keepalive_connections"] == 2
+
+    def test_http2_available_is_bool(self):
+        assert isinstance(http2_available(), bool)
+
+
+class TestCreateAsyncHttpClient:
+    def test_returns_async_client(self):
+        client = create_async_http_client(http2=False)
+        try:
+            assert isinstance(client, httpx.AsyncClient)
+        finally:
+            asyncio.run(client.aclose())
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    def _breaker(self, clock=None):
+        return CircuitBreaker(failure_rate=0.5, window=4, min_calls=2, cooldown=30, clock=clock or FakeClock())
+
+    def test_starts_closed(self):
+        breaker = self._breaker()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request()
+
+    def test_opens_when_failure_rate_reached(self):
+        breaker = self._breaker()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+        assert breaker.snapshot()["rejected"] == 1
+
+    def test_successes_keep_rate_below_threshold(self):
+        breaker = self._breaker()
+        for _ in range(3):
+            breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_after_cooldown_allows_single_trial(self):
+        clock = FakeClock()
+        breaker = self._breaker(clock)
+        breaker.record_failure()
+        breaker.record_failure()
+
+        clock.now = 31
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+    def test_trial_success_closes_circuit(self):
+        clock = FakeClock()
+        breaker = self._breaker(clock)
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.now = 31
+        breaker.allow_request()
+
+        breaker.record_success()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.snapshot()["failure_rate"] == 0.0
+
+    def test_trial_failure_reopens_for_another_cooldown(self):
+        clock = FakeClock()
+        breaker = self._breaker(clock)
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.now = 31
+        breaker.allow_request()
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        clock.now = 60
+        assert breaker.state == CircuitBreaker.OPEN
+        clock.now = 62
+        assert breaker.state == CircuitBreaker.HALF_OPEN
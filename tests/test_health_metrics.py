@@ -0,0 +1,83 @@
+"""Tests for health_metrics.py - In-memory OpenMetrics exporter."""
+
+from health_checker import HealthResult, HealthStatus
+from health_metrics import Counter, HealthMetrics, Histogram
+
+
+def _samples(text: str) -> dict[str, str]:
+    return dict(
+        line.rsplit(" ", 1) for line in text.splitlines() if line and not line.startswith("#")
+    )
+
+
+class TestPrimitives:
+    def test_counter_renders_total_suffix_and_escaped_labels(self):
+        counter = Counter("things", "Things seen.", ["name"])
+        counter.inc(name='a"b')
+        counter.inc(2, name='a"b')
+
+        lines = counter.render()
+
+        assert lines[0] == "# TYPE things counter"
+        assert lines[2] == 'things_total{name="a\\"b"} 3'
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("latency", "Latency.", [1, 5])
+        for value in (0.5, 3, 3, 10):
+            histogram.observe(value)
+
+        samples = _samples("\n".join(histogram.render()))
+
+        assert samples['latency_bucket{le="1.0"}'] == "1"
+        assert samples['latency_bucket{le="5.0"}'] == "3"
+        assert samples['latency_bucket{le="+Inf"}'] == "4"
+        assert samples["latency_count"] == "4"
+        assert samples["latency_sum"] == "16.5"
+
+    def test_unlabelled_series_start_at_zero(self):
+        assert Counter("ticks", "Ticks.").render()[2] == "ticks_total 0"
+
+
+class TestHealthMetrics:
+    def test_render_ends_with_eof(self):
+        assert HealthMetrics().render().endswith("# EOF\n")
+
+    def test_results_update_up_checks_and_response_time(self):
+        metrics = HealthMetrics()
+        metrics.observe_results([
+            HealthResult("postiz", HealthStatus.HEALTHY, 12),
+            HealthResult("redis", HealthStatus.UNHEALTHY, 700),
+        ])
+
+        samples = _samples(metrics.render())
+
+        assert samples['health_service_up{service="postiz"}'] == "1"
+        assert samples['health_service_up{service="redis"}'] == "0"
+        assert samples['health_checks_total{service="redis",status="unhealthy"}'] == "1"
+        assert samples['health_check_response_time_ms_bucket{service="redis",le="500.0"}'] == "0"
+        assert samples['health_check_response_time_ms_bucket{service="redis",le="1000.0"}'] == "1"
+
+    def test_scheduler_counters_advance_by_delta(self):
+        metrics = HealthMetrics()
+        metrics.observe_scheduler({"ticks": 3, "overruns": 1, "skipped": 2, "last_lag": 0.5})
+        metrics.observe_scheduler({"ticks": 4, "overruns": 2, "skipped": 2, "last_lag": 0.0})
+
+        samples = _samples(metrics.render())
+
+        assert samples["health_scheduler_overruns_total"] == "2"
+        assert samples["health_scheduler_skipped_ticks_total"] == "2"
+        assert samples["health_scheduler_lag_seconds"] == "0"
+
+    def test_webhook_and_transition_counters(self):
+        metrics = HealthMetrics()
+        metrics.observe_transition("postiz", "unhealthy")
+        metrics.observe_webhook_delivery(True)
+        metrics.observe_webhook_delivery(False)
+        metrics.observe_webhook_request(0.02)
+
+        samples = _samples(metrics.render())
+
+        assert samples['health_transitions_total{service="postiz",to_status="unhealthy"}'] == "1"
+        assert samples['health_webhook_deliveries_total{result="sent"}'] == "1"
+        assert samples['health_webhook_deliveries_total{result="failed"}'] == "1"
+        assert samples["health_webhook_request_seconds_count"] == "1"
@@ -3,7 +3,7 @@
 from unittest.mock import MagicMock, patch
 
 from health_checker import HealthResult, HealthStatus
-from health_monitor import run_once
+from health_monitor import run_events, run_once
 
 
 class TestRunOnce:
@@ -19,7 +19,7 @@ class TestRunOnce:
         ]
         mock_notifier = MagicMock()
         MockNotifier.return_value = mock_notifier
-        mock_notifier.process_result.return_value = None
+        mock_notifier.process_results.return_value = [None, None]
 
         exit_code = run_once(verbose=False)
 
@@ -37,7 +37,7 @@ class TestRunOnce:
         ]
         mock_notifier = MagicMock()
         MockNotifier.return_value = mock_notifier
-        mock_notifier.process_result.return_value = None
+        mock_notifier.process_results.return_value = [None, None]
 
         exit_code = run_once(verbose=False)
 
@@ -65,11 +65,11 @@ class TestRunOnce:
         mock_checker.check_all_services.return_value = results
         mock_notifier = MagicMock()
         MockNotifier.return_value = mock_notifier
-        mock_notifier.process_result.return_value = None
+        mock_notifier.process_results.return_value = [None, None, None]
 
         run_once(verbose=False)
 
-        assert mock_notifier.process_result.call_count == 3
+        mock_notifier.process_results.assert_called_once_with(results)
 
     @patch("health_monitor.HealthNotifier")
     @patch("health_monitor.HealthStorage")
@@ -82,8 +82,179 @@ class TestRunOnce:
         ]
         mock_notifier = MagicMock()
         MockNotifier.return_value = mock_notifier
-        mock_notifier.process_result.return_value = 42
+        mock_notifier.process_results.return_value = [42]
 
         exit_code = run_once(verbose=True)
 
         assert exit_code == 0
+
+
+class TestRunEvents:
+    @patch("health_monitor.HealthNotifier")
+    @patch("health_monitor.HealthStorage")
+    @patch("health_monitor.HealthChecker")
+    def test_reconciles_then_processes_events(self, MockChecker, MockStorage, MockNotifier):
+        mock_checker = MagicMock()
+        MockChecker.return_value = mock_checker
+        mock_checker.check_all_services.return_value = [
+            HealthResult("postiz", HealthStatus.HEALTHY, 10),
+        ]
+
+        def events(since, until):
+            yield HealthResult("postiz", HealthStatus.UNHEALTHY, 0, {"error": "died"})
+            raise KeyboardInterrupt
+
+        mock_checker.watch_events.side_effect = events
+        mock_notifier = MagicMock()
+        MockNotifier.return_value = mock_notifier
+        mock_notifier.process_results.return_value = [None]
+        mock_notifier.process_result.return_value = None
+
+        exit_code = run_events(reconcile_interval=60)
+
+        assert exit_code == 0
+        mock_notifier.process_results.assert_called_once()
+        processed = [c.args[0].status for c in mock_notifier.process_result.call_args_list]
+        assert processed == [HealthStatus.UNHEALTHY]
+
+    @patch("health_monitor.HealthChecker")
+    def test_returns_two_on_docker_error(self, MockChecker):
+        MockChecker.side_effect = RuntimeError("Cannot connect to Docker daemon")
+
+        assert run_events() == 2
+
+
+class TestCompaction:
+    @patch("health_monitor.HealthNotifier")
+    @patch("health_monitor.HealthStorage")
+    @patch("health_monitor.HealthChecker")
+    def test_run_once_compacts_storage(self, MockChecker, MockStorage, MockNotifier):
+        mock_checker = MagicMock()
+        MockChecker.return_value = mock_checker
+        mock_checker.check_all_services.return_value = []
+        MockNotifier.return_value.process_results.return_value = []
+        mock_storage = MockStorage.return_value
+        mock_storage.compact.return_value = 0
+
+        run_once(verbose=False)
+
+        mock_storage.compact.assert_called_once()
+        mock_storage.close.assert_called_once()
+
+    @patch("health_monitor.HealthNotifier")
+    @patch("health_monitor.HealthStorage")
+    @patch("health_monitor.HealthChecker")
+    def test_run_once_drains_outbox(self, MockChecker, MockStorage, MockNotifier):
+        from health_monitor import ONCE_OUTBOX_TIMEOUT
+
+        MockChecker.return_value.check_all_services.return_value = []
+        MockNotifier.return_value.process_results.return_value = []
+        MockNotifier.return_value.drain_outbox.return_value = 0
+        MockStorage.return_value.compact.return_value = 0
+
+        run_once(verbose=False)
+
+        MockNotifier.return_value.drain_outbox.assert_called_once_with(timeout=ONCE_OUTBOX_TIMEOUT)
+
+
+class TestAlerting:
+    @patch("health_monitor.ConsoleAlertChannel")
+    @patch("health_monitor.HealthNotifier")
+    @patch("health_monitor.HealthStorage")
+    @patch("health_monitor.HealthChecker")
+    def test_run_once_alerts_on_streak_resumed_from_storage(
+        self, MockChecker, MockStorage, MockNotifier, MockConsole
+    ):
+        MockChecker.return_value.check_all_services.return_value = [
+            HealthResult("postiz", HealthStatus.UNHEALTHY, 100, {"error": "down"}),
+        ]
+        MockNotifier.return_value.process_results.return_value = [None]
+        MockStorage.return_value.get_failure_streaks.return_value = {"postiz": 2}
+        MockStorage.return_value.compact.return_value = 0
+        MockConsole.return_value = MagicMock(spec=["send"])
+
+        run_once(verbose=False)
+
+        alert = MockConsole.return_value.send.call_args[0][0]
+        assert alert.service_name == "postiz"
+        assert alert.consecutive_failures == 3
+
+    @patch("health_monitor.COALESCE_WINDOW", 5.0)
+    def test_alerter_coalesces_with_configured_window(self):
+        from health_alerter import CoalescingAlertChannel
+        from health_monitor import create_alerter
+
+        storage = MagicMock()
+        storage.get_failure_streaks.return_value = {}
+
+        alerter = create_alerter(storage)
+
+        assert all(isinstance(c, CoalescingAlertChannel) for c in alerter.channels)
+        assert alerter.channels[0].window == 5.0
+
+
+class TestRunOnceViaDaemon:
+    def _status(self, status="healthy", age=0):
+        from health_checker import SERVICE_CONTAINERS
+
+        now = __import__("time").time()
+        return [
+            {
+                "service": name,
+                "status": status,
+                "response_time_ms": 3,
+                "details": None,
+                "checked_at": now - age,
+            }
+            for name in SERVICE_CONTAINERS
+        ]
+
+    @patch("health_monitor.HealthChecker")
+    @patch("health_monitor.fetch_json")
+    @patch("health_monitor.API_SOCKET", "/run/health.sock")
+    def test_uses_resident_monitor_results(self, mock_fetch, MockChecker):
+        mock_fetch.return_value = self._status("unhealthy")
+
+        assert run_once(verbose=True) == 1
+        MockChecker.assert_not_called()
+
+    @patch("health_monitor.HealthNotifier")
+    @patch("health_monitor.HealthStorage")
+    @patch("health_monitor.HealthChecker")
+    @patch("health_monitor.fetch_json")
+    @patch("health_monitor.API_SOCKET", "/run/health.sock")
+    def test_stale_results_fall_back_to_local_check(
+        self, mock_fetch, MockChecker, MockStorage, MockNotifier
+    ):
+        mock_fetch.return_value = self._status(age=3600)
+        MockChecker.return_value.check_all_services.return_value = []
+        MockNotifier.return_value.process_results.return_value = []
+        MockStorage.return_value.compact.return_value = 0
+
+        assert run_once() == 0
+        MockChecker.assert_called_once()
+
+    @patch("health_monitor.HealthChecker")
+    @patch("health_monitor.fetch_json")
+    @patch("health_monitor.API_SOCKET", "/run/health.sock")
+    def test_local_flag_skips_daemon(self, mock_fetch, MockChecker):
+        MockChecker.side_effect = RuntimeError("no docker")
+
+        assert run_once(use_daemon=False) == 2
+        mock_fetch.assert_not_called()
+
+
+class TestStartup:
+    def test_heavy_dependencies_not_loaded_on_import(self):
+        import subprocess
+        import sys
+        from pathlib import Path
+
+        scripts = Path(__file__).parent.parent / "scripts"
+        code = (
+            "import sys; sys.path.insert(0, %r); import health_monitor; "
+            "print(type(sys.modules['docker']).__name__, type(sys.modules['httpx']).__name__)"
+        ) % str(scripts)
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+        assert out.stdout.split() == ["_LazyModule", "_LazyModule"]
@@ -169,3 +169,492 @@ class TestWebhookPayload:
         assert payload["details"] == "timeout"
         assert payload["stack"] == "postiz-social-automation"
         assert "timestamp" in payload
+
+
+class TestProcessResults:
+    def test_batch_detects_transitions_per_service(self, temp_db):
+        temp_db.record_check("postiz", "healthy", 50)
+        temp_db.record_check("postiz-redis", "healthy", 50)
+        notifier = HealthNotifier(temp_db, webhook_url="")
+        results = [
+            HealthResult("postiz", HealthStatus.HEALTHY, 10),
+            HealthResult("postiz-redis", HealthStatus.UNHEALTHY, 10, {"error": "down"}),
+            HealthResult("temporal", HealthStatus.MISSING, 0),
+        ]
+
+        transition_ids = notifier.process_results(results)
+
+        assert transition_ids[0] is None
+        assert isinstance(transition_ids[1], int)
+        assert transition_ids[2] is None
+        assert temp_db.get_last_status("postiz-redis") == "unhealthy"
+        assert temp_db.get_last_status("temporal") == "missing"
+
+    def test_batch_matches_sequential_processing(self, temp_db):
+        notifier = HealthNotifier(temp_db, webhook_url="")
+        results = [
+            HealthResult("postiz", HealthStatus.HEALTHY, 10),
+            HealthResult("postiz", HealthStatus.UNHEALTHY, 10),
+        ]
+
+        transition_ids = notifier.process_results(results)
+
+        assert transition_ids[0] is None
+        assert transition_ids[1] is not None
+
+    @patch("health_notifier.httpx")
+    def test_batch_sends_webhook_for_transitions(self, mock_httpx, temp_db):
+        import sqlite3
+
+        mock_client = MagicMock()
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_client.__enter__ = MagicMock(return_value=mock_client)
+        mock_client.__exit__ = MagicMock(return_value=False)
+        mock_client.post.return_value = mock_response
+        mock_httpx.Client.return_value = mock_client
+
+        temp_db.record_check("postiz", "healthy", 50)
+        notifier = HealthNotifier(temp_db, webhook_url="https://n8n.example.com/webhook/test")
+
+        tid = notifier.process_results([HealthResult("postiz", HealthStatus.UNHEALTHY, 100)])[0]
+
+        mock_client.post.assert_called_once()
+        with sqlite3.connect(temp_db.db_path) as conn:
+            row = conn.execute(
+                "SELECT webhook_sent FROM state_transitions WHERE id = ?", (tid,)
+            ).fetchone()
+        assert row[0] == 1
+
+
+class TestBackgroundDelivery:
+    def test_process_result_returns_before_delivery(self, temp_db):
+        import threading
+
+        release = threading.Event()
+        notifier = HealthNotifier(
+            temp_db,
+            webhook_url="https://n8n.example.com/webhook/test",
+            background=True,
+            coalesce_window=0,
+        )
+        sent = []
+
+        def slow_send(**payload):
+            release.wait(5)
+            sent.append(payload)
+            return True
+
+        notifier.delivery._send = slow_send
+        temp_db.record_check("postiz", "healthy", 50)
+
+        tid = notifier.process_result(HealthResult("postiz", HealthStatus.UNHEALTHY, 100))
+
+        assert tid is not None
+        assert sent == []
+        release.set()
+        notifier.delivery.join()
+        notifier.close()
+        assert sent[0]["service_name"] == "postiz"
+
+    @patch("health_notifier.httpx")
+    def test_marks_sent_when_delivery_completes(self, mock_httpx, temp_db):
+        import sqlite3
+
+        mock_client = MagicMock()
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_client.__enter__ = MagicMock(return_value=mock_client)
+        mock_client.__exit__ = MagicMock(return_value=False)
+        mock_client.post.return_value = mock_response
+        mock_httpx.Client.return_value = mock_client
+
+        temp_db.record_check("postiz", "healthy", 50)
+        notifier = HealthNotifier(
+            temp_db, webhook_url="https://n8n.example.com/webhook/test", background=True
+        )
+
+        tid = notifier.process_result(HealthResult("postiz", HealthStatus.UNHEALTHY, 100))
+        notifier.close(timeout=5)
+
+        with sqlite3.connect(temp_db.db_path) as conn:
+            row = conn.execute(
+                "SELECT webhook_sent FROM state_transitions WHERE id = ?", (tid,)
+            ).fetchone()
+        assert row[0] == 1
+
+    def test_slow_outbox_drain_does_not_block_deliveries(self, temp_db):
+        import threading
+
+        from health_notifier import WebhookDeliveryQueue
+
+        release = threading.Event()
+        delivered = []
+        delivery = WebhookDeliveryQueue(
+            lambda **payload: True, delivered.append, idle=lambda: release.wait(5)
+        )
+
+        delivery.enqueue(1, service_name="temporal")
+        delivery.join()
+
+        assert delivered == [1]
+        release.set()
+        delivery.close(timeout=5)
+
+    def test_drain_skips_transitions_still_queued(self, temp_db):
+        import sqlite3
+        import threading
+
+        temp_db.record_check("temporal", "healthy", 10)
+        notifier = HealthNotifier(
+            temp_db, webhook_url="https://n8n.example.com/webhook/test", background=True,
+            coalesce_window=0,
+        )
+        release = threading.Event()
+        posts = []
+
+        def send(**payload):
+            release.wait(5)
+            posts.append(payload["service_name"])
+            return True
+
+        notifier.delivery._send = send
+        tid = notifier.process_result(HealthResult("temporal", HealthStatus.UNHEALTHY, 10))
+        with sqlite3.connect(temp_db.db_path) as conn:
+            conn.execute("UPDATE state_transitions SET next_attempt_at = 0 WHERE id = ?", (tid,))
+        notifier._send_change = MagicMock(return_value=True)
+
+        assert notifier.drain_outbox() == 0
+        release.set()
+        notifier.close(timeout=5)
+
+        notifier._send_change.assert_not_called()
+        assert posts == ["temporal"]
+
+    def test_rejected_delivery_not_retried(self, temp_db):
+        from health_notifier import WebhookDeliveryQueue
+
+        failed, rejected = [], []
+        delivery = WebhookDeliveryQueue(
+            lambda **payload: None, lambda tid: None,
+            on_failed=failed.append, on_rejected=rejected.append,
+        )
+        delivery.enqueue(7, service_name="postiz")
+        delivery.join()
+        delivery.close()
+
+        assert (failed, rejected) == ([], [7])
+
+    def test_no_worker_without_url(self, temp_db):
+        notifier = HealthNotifier(temp_db, webhook_url="", background=True)
+
+        assert notifier.delivery is None
+        notifier.close()
+
+
+class TestWebhookOutbox:
+    def _due(self, temp_db, tid):
+        import sqlite3
+
+        with sqlite3.connect(temp_db.db_path) as conn:
+            conn.execute("UPDATE state_transitions SET next_attempt_at = 0 WHERE id = ?", (tid,))
+
+    def _row(self, temp_db, tid):
+        import sqlite3
+
+        with sqlite3.connect(temp_db.db_path) as conn:
+            return conn.execute(
+                "SELECT webhook_sent, delivery_attempts, next_attempt_at FROM state_transitions WHERE id = ?",
+                (tid,),
+            ).fetchone()
+
+    def test_new_transitions_not_due_immediately(self, temp_db):
+        temp_db.record_transition("postiz", "healthy", "unhealthy")
+
+        assert temp_db.get_pending_transitions() == []
+
+    def test_drain_redelivers_and_marks_sent(self, temp_db):
+        tid = temp_db.record_transition("postiz", "healthy", "unhealthy", {"error": "down"})
+        self._due(temp_db, tid)
+        notifier = HealthNotifier(temp_db, webhook_url="https://n8n.example.com/webhook/test")
+        notifier._send_change = MagicMock(return_value=True)
+
+        assert notifier.drain_outbox() == 1
+
+        kwargs = notifier._send_change.call_args.kwargs
+        assert kwargs["details"] == {"error": "down"}
+        assert kwargs["retry"] is False
+        assert self._row(temp_db, tid)[0] == 1
+
+    def test_failed_delivery_backs_off(self, temp_db):
+        import time
+
+        tid = temp_db.record_transition("postiz", "healthy", "unhealthy")
+        self._due(temp_db, tid)
+        notifier = HealthNotifier(temp_db, webhook_url="https://n8n.example.com/webhook/test")
+        notifier._send_change = MagicMock(return_value=False)
+
+        assert notifier.drain_outbox() == 0
+
+        sent, attempts, next_attempt_at = self._row(temp_db, tid)
+        assert sent == 0
+        assert attempts == 1
+        assert next_attempt_at > time.time()
+        assert temp_db.get_pending_transitions() == []
+
+    def test_drain_stops_after_failed_wave(self, temp_db):
+        for _ in range(10):
+            self._due(temp_db, temp_db.record_transition("postiz", "healthy", "unhealthy"))
+        notifier = HealthNotifier(temp_db, webhook_url="https://n8n.example.com/webhook/test")
+        notifier.outbox.max_in_flight = 2
+        notifier._send_change = MagicMock(return_value=False)
+
+        notifier.drain_outbox()
+
+        assert notifier._send_change.call_count == 2
+
+    def test_inline_failure_schedules_retry(self, temp_db):
+        temp_db.record_check("postiz", "healthy", 50)
+        notifier = HealthNotifier(temp_db, webhook_url="https://n8n.example.com/webhook/test")
+        notifier._send_change = MagicMock(return_value=False)
+
+        tid = notifier.process_result(HealthResult("postiz", HealthStatus.UNHEALTHY, 100))
+
+        assert self._row(temp_db, tid)[1] == 1
+
+    def test_rejected_delivery_leaves_outbox(self, temp_db):
+        tid = temp_db.record_transition("postiz", "healthy", "unhealthy")
+        self._due(temp_db, tid)
+        notifier = HealthNotifier(temp_db, webhook_url="https://n8n.example.com/webhook/test")
+        notifier._post = MagicMock(return_value=MagicMock(status_code=404))
+
+        assert notifier.drain_outbox() == 0
+
+        sent, attempts, next_attempt_at = self._row(temp_db, tid)
+        assert (sent, attempts, next_attempt_at) == (0, 1, float("inf"))
+        assert temp_db.get_pending_transitions(now=1e18) == []
+
+    def test_inline_rejection_not_rescheduled(self, temp_db):
+        temp_db.record_check("postiz", "healthy", 50)
+        notifier = HealthNotifier(temp_db, webhook_url="https://n8n.example.com/webhook/test")
+        notifier._post = MagicMock(return_value=MagicMock(status_code=400))
+
+        tid = notifier.process_result(HealthResult("postiz", HealthStatus.UNHEALTHY, 100))
+
+        notifier._post.assert_called_once()
+        assert self._row(temp_db, tid)[2] == float("inf")
+
+    def test_drain_stops_at_timeout(self, temp_db):
+        for _ in range(4):
+            self._due(temp_db, temp_db.record_transition("postiz", "healthy", "unhealthy"))
+        notifier = HealthNotifier(temp_db, webhook_url="https://n8n.example.com/webhook/test")
+        notifier.outbox.max_in_flight = 1
+        notifier._send_change = MagicMock(return_value=True)
+
+        assert notifier.drain_outbox(timeout=0) == 0
+        notifier._send_change.assert_not_called()
+
+    def test_backoff_grows_and_is_capped(self, temp_db):
+        from health_notifier import WebhookOutbox
+
+        outbox = WebhookOutbox(temp_db, deliver=lambda row: True, base_delay=5, max_delay=60)
+
+        assert 2.5 <= outbox.next_delay(1) <= 5
+        assert 10 <= outbox.next_delay(3) <= 20
+        assert 30 <= outbox.next_delay(20) <= 60
+
+
+class TestSharedClient:
+    @patch("health_notifier.httpx")
+    def test_injected_client_reused_across_sends(self, mock_httpx, temp_db):
+        shared = MagicMock()
+        shared.post.return_value = MagicMock(status_code=200)
+        notifier = HealthNotifier(
+            temp_db, webhook_url="https://n8n.example.com/webhook/test", client=shared
+        )
+
+        notifier.send_webhook("postiz", "healthy", "unhealthy", None)
+        notifier.send_webhook("redis", "healthy", "unhealthy", None)
+
+        assert shared.post.call_count == 2
+        mock_httpx.Client.assert_not_called()
+
+
+class TestCoalescing:
+    def test_queue_batches_deliveries_within_window(self, temp_db):
+        import threading
+
+        from health_notifier import WebhookDeliveryQueue
+
+        delivered = []
+        batches = []
+        queued = threading.Event()
+
+        def send_batch(payloads):
+            batches.append(payloads)
+            return True
+
+        def send(**payload):
+            queued.wait(5)
+            return True
+
+        delivery = WebhookDeliveryQueue(
+            send, delivered.append, send_batch=send_batch, coalesce_window=0.3
+        )
+        for tid, service in enumerate(["postiz-postgres", "postiz", "temporal"], start=1):
+            delivery.enqueue(tid, service_name=service, from_status="healthy",
+                             to_status="unhealthy", details=None)
+        queued.set()
+        delivery.join()
+        delivery.close()
+
+        assert len(batches) == 1
+        assert [p["service_name"] for p in batches[0]] == ["postiz-postgres", "postiz", "temporal"]
+        assert delivered == [1, 2, 3]
+
+    def test_sweep_transitions_sent_as_one_batch(self, temp_db):
+        for service in ("postiz", "postiz-postgres"):
+            temp_db.record_check(service, "healthy", 10)
+        notifier = HealthNotifier(
+            temp_db, webhook_url="https://n8n.example.com/webhook/test", coalesce_window=5
+        )
+        notifier._post = MagicMock(return_value=MagicMock(status_code=200))
+
+        notifier.process_results([
+            HealthResult("postiz", HealthStatus.UNHEALTHY, 10, {"error": "down"}),
+            HealthResult("postiz-postgres", HealthStatus.UNHEALTHY, 10, {"error": "down"}),
+        ])
+
+        notifier._post.assert_called_once()
+        payload = notifier._post.call_args.args[0]
+        assert payload["event"] == "service_status_change_batch"
+        assert [c["service"] for c in payload["changes"]] == ["postiz", "postiz-postgres"]
+        assert temp_db.get_pending_transitions(now=float("inf")) == []
+
+    def test_sweep_transitions_sent_separately_without_window(self, temp_db):
+        for service in ("postiz", "postiz-postgres"):
+            temp_db.record_check(service, "healthy", 10)
+        notifier = HealthNotifier(
+            temp_db, webhook_url="https://n8n.example.com/webhook/test", coalesce_window=0
+        )
+        notifier._post = MagicMock(return_value=MagicMock(status_code=200))
+
+        notifier.process_results([
+            HealthResult("postiz", HealthStatus.UNHEALTHY, 10, {"error": "down"}),
+            HealthResult("postiz-postgres", HealthStatus.UNHEALTHY, 10, {"error": "down"}),
+        ])
+
+        events = [c.args[0]["event"] for c in notifier._post.call_args_list]
+        assert events == ["service_status_change", "service_status_change"]
+
+
+class TestCircuitBreaker:
+    @patch("health_notifier.time.sleep")
+    @patch("health_notifier.httpx")
+    def test_open_circuit_fails_fast_and_keeps_row_in_outbox(self, mock_httpx, mock_sleep, temp_db):
+        import sqlite3
+
+        from health_http import CircuitBreaker
+
+        mock_httpx.RequestError = Exception
+        shared = MagicMock()
+        shared.post.side_effect = Exception("connection refused")
+        breaker = CircuitBreaker(failure_rate=0.5, window=4, min_calls=2, cooldown=60)
+        notifier = HealthNotifier(
+            temp_db, webhook_url="https://n8n.example.com/webhook/test", client=shared, breaker=breaker
+        )
+
+        assert notifier.send_webhook("postiz", "healthy", "unhealthy", None) is False
+        assert breaker.state == CircuitBreaker.OPEN
+        calls = shared.post.call_count
+
+        temp_db.record_check("postiz", "healthy", 10, None)
+        notifier.process_result(
+            HealthResult(service_name="postiz", status=HealthStatus.UNHEALTHY, response_time_ms=5)
+        )
+
+        assert shared.post.call_count == calls
+        assert notifier.drain_outbox() == 0
+        with sqlite3.connect(temp_db.db_path) as conn:
+            unsent = conn.execute(
+                "SELECT COUNT(*) FROM state_transitions WHERE webhook_sent = 0"
+            ).fetchone()[0]
+        assert unsent == 1
+
+
+    def test_background_drain_skipped_while_open(self, temp_db):
+        import sqlite3
+
+        from health_http import CircuitBreaker
+
+        tid = temp_db.record_transition("postiz", "healthy", "unhealthy")
+        with sqlite3.connect(temp_db.db_path) as conn:
+            conn.execute("UPDATE state_transitions SET next_attempt_at = 0 WHERE id = ?", (tid,))
+        breaker = CircuitBreaker(min_calls=1, cooldown=60)
+        breaker.record_failure()
+        shared = MagicMock()
+        notifier = HealthNotifier(
+            temp_db,
+            webhook_url="https://n8n.example.com/webhook/test",
+            background=True,
+            client=shared,
+            breaker=breaker,
+        )
+        notifier.close(timeout=5)
+
+        shared.post.assert_not_called()
+        with sqlite3.connect(temp_db.db_path) as conn:
+            attempts, next_attempt_at = conn.execute(
+                "SELECT delivery_attempts, next_attempt_at FROM state_transitions WHERE id = ?",
+                (tid,),
+            ).fetchone()
+        assert (attempts, next_attempt_at) == (0, 0)
+
+    def test_unexpected_error_releases_half_open_trial(self, temp_db):
+        from health_http import CircuitBreaker
+
+        now = [0.0]
+        breaker = CircuitBreaker(min_calls=1, cooldown=30, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 31.0
+        shared = MagicMock()
+        shared.post.side_effect = RuntimeError("client has been closed")
+        notifier = HealthNotifier(
+            temp_db, webhook_url="https://n8n.example.com/webhook/test", client=shared, breaker=breaker
+        )
+
+        with pytest.raises(RuntimeError):
+            notifier.send_webhook("postiz", "healthy", "unhealthy", None)
+
+        assert breaker.state == CircuitBreaker.OPEN
+        now[0] = 62.0
+        shared.post.side_effect = None
+        shared.post.return_value = MagicMock(status_code=200)
+        assert notifier.send_webhook("postiz", "healthy", "unhealthy", None) is True
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestMetrics:
+    def test_results_transitions_and_deliveries_reported(self, temp_db):
+        from health_metrics import HealthMetrics
+
+        metrics = HealthMetrics()
+        shared = MagicMock()
+        shared.post.return_value = MagicMock(status_code=200)
+        notifier = HealthNotifier(
+            temp_db,
+            webhook_url="https://n8n.example.com/webhook/test",
+            client=shared,
+            metrics=metrics,
+        )
+        temp_db.record_check("postiz", "healthy", 10, None)
+
+        notifier.process_results(
+            [HealthResult(service_name="postiz", status=HealthStatus.UNHEALTHY, response_time_ms=5)]
+        )
+
+        text = metrics.render()
+        assert 'health_transitions_total{service="postiz",to_status="unhealthy"} 1' in text
+        assert 'health_webhook_deliveries_total{result="sent"} 1' in text
+        assert "health_webhook_request_seconds_count 1" in text
+        assert 'health_service_up{service="postiz"} 0' in text
@@ -0,0 +1,205 @@
+"""Tests for health_scheduler.py - Fixed-rate sweep scheduling."""
+
+import pytest
+
+from health_checker import HealthResult, HealthStatus
+from health_scheduler import FixedRateScheduler, ServiceScheduler, parse_service_intervals
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _scheduler(clock, interval=10, jitter=0.0, rng=lambda: 0.5):
+    return FixedRateScheduler(interval, jitter=jitter, clock=clock, sleep=clock.sleep, rng=rng)
+
+
+class TestFixedRateScheduler:
+    def test_first_tick_runs_immediately(self):
+        clock = FakeClock()
+        scheduler = _scheduler(clock)
+
+        scheduler.wait()
+
+        assert clock.sleeps == []
+        assert scheduler.ticks == 1
+
+    def test_sweep_time_does_not_drift_the_period(self):
+        clock = FakeClock()
+        scheduler = _scheduler(clock)
+        starts = []
+
+        for sweep_time in [3, 7, 1, 9]:
+            scheduler.wait()
+            starts.append(clock.now)
+            clock.now += sweep_time
+
+        assert starts == [100, 110, 120, 130]
+        assert scheduler.overruns == 0
+
+    def test_overrun_fires_immediately_and_skips_missed_ticks(self):
+        clock = FakeClock()
+        scheduler = _scheduler(clock)
+
+        scheduler.wait()
+        clock.now += 25  # runs past the ticks at 110 and 120
+        scheduler.wait()
+
+        assert clock.sleeps == []
+        assert scheduler.overruns == 1
+        assert scheduler.skipped == 1
+
+        scheduler.wait()
+        assert clock.now == 130
+
+    def test_jitter_delays_within_interval_fraction(self):
+        clock = FakeClock()
+        scheduler = _scheduler(clock, jitter=0.2, rng=lambda: 0.5)
+
+        scheduler.wait()
+        scheduler.wait()
+
+        assert clock.now == 111  # deadline 110 plus 0.5 * 0.2 * 10
+        scheduler.wait()
+        assert clock.now == 121  # jitter does not accumulate
+
+    def test_stats(self):
+        clock = FakeClock()
+        scheduler = _scheduler(clock)
+        scheduler.wait()
+        clock.now += 12
+        scheduler.wait()
+
+        assert scheduler.stats() == {"ticks": 2, "overruns": 1, "skipped": 0, "last_lag": 2.0}
+
+
+def _result(name, status):
+    return HealthResult(name, status, 1)
+
+
+class TestParseServiceIntervals:
+    def test_parses_pairs(self):
+        assert parse_service_intervals("temporal-ui=300, postiz-postgres=15") == {
+            "temporal-ui": 300.0,
+            "postiz-postgres": 15.0,
+        }
+
+    def test_empty_spec(self):
+        assert parse_service_intervals("") == {}
+
+    def test_rejects_malformed_entries(self):
+        with pytest.raises(ValueError):
+            parse_service_intervals("temporal-ui")
+        with pytest.raises(ValueError):
+            parse_service_intervals("temporal-ui=0")
+
+    def test_rejects_unknown_services(self):
+        with pytest.raises(ValueError, match="temporal-iu"):
+            parse_service_intervals("temporal-iu=300")
+
+
+class TestServiceScheduler:
+    def test_all_services_due_at_start(self):
+        clock = FakeClock()
+        scheduler = ServiceScheduler(["a", "b"], 60, clock=clock, sleep=clock.sleep)
+
+        assert sorted(scheduler.wait()) == ["a", "b"]
+
+    def test_per_service_intervals(self):
+        clock = FakeClock()
+        scheduler = ServiceScheduler(
+            ["db", "ui"], 60, {"db": 15}, adaptive=False, clock=clock, sleep=clock.sleep
+        )
+        for name in scheduler.wait():
+            scheduler.record(_result(name, HealthStatus.HEALTHY))
+
+        assert scheduler.wait() == ["db"]
+        assert clock.now == 115
+
+    def test_stats_report_late_checks(self):
+        clock = FakeClock()
+        scheduler = ServiceScheduler(["a"], 10, adaptive=False, clock=clock, sleep=clock.sleep)
+        scheduler.wait()
+        scheduler.record(_result("a", HealthStatus.HEALTHY))
+
+        scheduler.wait()
+        assert scheduler.stats() == {"ticks": 2, "overruns": 0, "skipped": 0, "last_lag": 0}
+
+        scheduler.record(_result("a", HealthStatus.HEALTHY))
+        clock.now += 14
+        scheduler.wait()
+
+        assert scheduler.stats() == {"ticks": 3, "overruns": 1, "skipped": 0, "last_lag": 4}
+
+    def test_slow_check_does_not_drift_schedule(self):
+        clock = FakeClock()
+        scheduler = ServiceScheduler(["a"], 10, adaptive=False, clock=clock, sleep=clock.sleep)
+        starts = []
+        for _ in range(3):
+            scheduler.wait()
+            starts.append(clock.now)
+            clock.now += 3
+            scheduler.record(_result("a", HealthStatus.HEALTHY))
+
+        assert starts == [100, 110, 120]
+
+    def test_overrun_skips_missed_intervals(self):
+        clock = FakeClock()
+        scheduler = ServiceScheduler(["a"], 10, adaptive=False, clock=clock, sleep=clock.sleep)
+        scheduler.wait()
+        clock.now += 25
+        scheduler.record(_result("a", HealthStatus.HEALTHY))
+
+        scheduler.wait()
+
+        assert clock.now == 125
+        assert scheduler.stats()["skipped"] == 1
+        assert scheduler.stats()["last_lag"] == 5
+
+    def test_adaptive_backoff_survives_long_healthy_streak(self):
+        scheduler = ServiceScheduler(
+            ["temporal-ui"], 60, parse_service_intervals("temporal-ui=30"), adaptive=True,
+            max_interval=300, clock=FakeClock(),
+        )
+
+        delays = {scheduler.next_interval("temporal-ui", HealthStatus.HEALTHY) for _ in range(2000)}
+
+        assert max(delays) == 300
+
+    def test_adaptive_backs_off_while_healthy(self):
+        scheduler = ServiceScheduler(["a"], 10, adaptive=True, max_interval=35, clock=FakeClock())
+
+        delays = [scheduler.next_interval("a", HealthStatus.HEALTHY) for _ in range(4)]
+
+        assert delays == [10, 20, 35, 35]
+
+    def test_adaptive_polls_fast_while_failing_and_resets_backoff(self):
+        scheduler = ServiceScheduler(
+            ["a"], 60, adaptive=True, fast_interval=5, max_interval=600, clock=FakeClock()
+        )
+        scheduler.next_interval("a", HealthStatus.HEALTHY)
+        scheduler.next_interval("a", HealthStatus.HEALTHY)
+
+        assert scheduler.next_interval("a", HealthStatus.UNHEALTHY) == 5
+        assert scheduler.next_interval("a", HealthStatus.MISSING) == 5
+
+    def test_flapping_service_stays_fast_while_healthy(self):
+        scheduler = ServiceScheduler(["a"], 60, adaptive=True, fast_interval=5, clock=FakeClock())
+        for status in [HealthStatus.HEALTHY, HealthStatus.UNHEALTHY]:
+            scheduler.next_interval("a", status)
+
+        assert scheduler.next_interval("a", HealthStatus.HEALTHY) == 5
+
+    def test_fixed_mode_ignores_status(self):
+        scheduler = ServiceScheduler(["a"], 60, adaptive=False, clock=FakeClock())
+
+        assert scheduler.next_interval("a", HealthStatus.UNHEALTHY) == 60
@@ -61,6 +61,16 @@ class TestStateTransitions:
             ).fetchone()
         assert row[0] == 1
 
+    def test_recent_transitions_newest_first(self, temp_db):
+        first = temp_db.record_transition("postiz", "healthy", "unhealthy")
+        second = temp_db.record_transition("redis", "healthy", "missing")
+
+        recent = temp_db.get_recent_transitions(limit=5)
+
+        assert [t["id"] for t in recent] == [second, first]
+        assert recent[0]["to_status"] == "missing"
+        assert temp_db.get_recent_transitions(limit=1)[0]["id"] == second
+
 
 class TestHistory:
     def test_returns_all_recent_checks(self, temp_db):
@@ -88,3 +98,397 @@ class TestUptimeStats:
     def test_empty_returns_empty_dict(self, temp_db):
         stats = temp_db.get_uptime_stats(days=1)
         assert stats == {}
+
+
+class TestConnection:
+    def test_uses_wal_journal(self, temp_db):
+        import sqlite3
+
+        with sqlite3.connect(temp_db.db_path) as conn:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_reader_not_blocked_by_open_write_transaction(self, temp_db):
+        import sqlite3
+
+        temp_db.record_check("postiz", "healthy", 50)
+        writer = sqlite3.connect(temp_db.db_path)
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute(
+            "INSERT INTO health_checks (service_name, status) VALUES ('postiz', 'unhealthy')"
+        )
+        try:
+            history = temp_db.get_history(hours=1)
+        finally:
+            writer.rollback()
+            writer.close()
+        assert len(history) == 1
+
+    def test_context_manager_closes_connection(self, tmp_path):
+        import sqlite3
+
+        import pytest
+
+        from health_storage import HealthStorage
+
+        with HealthStorage(tmp_path / "ctx.sqlite") as storage:
+            storage.record_check("postiz", "healthy", 10)
+        with pytest.raises(sqlite3.ProgrammingError):
+            storage.get_history(hours=1)
+
+
+class TestBatchOperations:
+    def test_get_last_statuses_for_many_services(self, temp_db):
+        temp_db.record_check("postiz", "healthy", 50)
+        temp_db.record_check("postiz", "unhealthy", 50)
+        temp_db.record_check("redis", "missing", 0)
+
+        statuses = temp_db.get_last_statuses(["postiz", "redis", "unknown"])
+
+        assert statuses == {"postiz": "unhealthy", "redis": "missing"}
+
+    def test_record_sweep_returns_transition_ids(self, temp_db):
+        ids = temp_db.record_sweep(
+            [("postiz", "unhealthy", 10, {"error": "down"}), ("redis", "healthy", 5, None)],
+            [("postiz", "healthy", "unhealthy", {"error": "down"})],
+        )
+
+        assert len(ids) == 1
+        assert temp_db.get_last_status("postiz") == "unhealthy"
+        assert len(temp_db.get_history(hours=1)) == 2
+
+
+class TestLastStatusCache:
+    def test_cache_warmed_from_existing_database(self, temp_db):
+        from health_storage import HealthStorage
+
+        temp_db.record_check("postiz", "healthy", 50)
+        temp_db.record_check("postiz", "unhealthy", 50)
+        temp_db.record_check("redis", "missing", 0)
+
+        with HealthStorage(temp_db.db_path) as reopened:
+            assert reopened.get_last_status("postiz") == "unhealthy"
+            assert reopened.get_last_status("redis") == "missing"
+
+    def test_same_second_checks_resolve_by_insertion_order(self, temp_db):
+        import sqlite3
+
+        from health_storage import HealthStorage
+
+        with sqlite3.connect(temp_db.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO health_checks (service_name, status, checked_at) VALUES (?, ?, ?)",
+                [
+                    ("postiz", "unhealthy", "2026-01-01 00:00:00"),
+                    ("postiz", "healthy", "2026-01-01 00:00:00"),
+                ],
+            )
+
+        with HealthStorage(temp_db.db_path) as reopened:
+            assert reopened.get_last_status("postiz") == "healthy"
+
+    def test_lookup_does_not_query_database(self, temp_db):
+        temp_db.record_check("postiz", "healthy", 50)
+        temp_db.close()
+
+        assert temp_db.get_last_status("postiz") == "healthy"
+
+
+def _insert_old_checks(db_path, rows):
+    """Insert (service_name, status, response_time_ms, checked_at) rows directly."""
+    import sqlite3
+
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            """INSERT INTO health_checks (service_name, status, response_time_ms, checked_at)
+               VALUES (?, ?, ?, ?)""",
+            rows,
+        )
+
+
+def _days_ago(days, time="12:00:00"):
+    from datetime import datetime, timedelta, timezone
+
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime(f"%Y-%m-%d {time}")
+
+
+class TestRetention:
+    def test_schema_has_rollup_tables(self, temp_db):
+        import sqlite3
+
+        with sqlite3.connect(temp_db.db_path) as conn:
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        assert {"health_rollup_minute", "health_rollup_hour", "health_rollup_day"} <= tables
+
+    def test_compact_moves_old_rows_into_rollups(self, temp_db):
+        old_day = _days_ago(10)
+        _insert_old_checks(temp_db.db_path, [
+            ("postiz", "healthy", 10, old_day),
+            ("postiz", "healthy", 30, old_day),
+            ("postiz", "unhealthy", 20, old_day),
+            ("postiz", "missing", None, old_day),
+        ])
+        temp_db.record_check("postiz", "healthy", 5)
+
+        compacted = temp_db.compact(retention_days=7)
+
+        assert compacted == 4
+        assert len(temp_db.get_history(hours=24 * 30)) == 1
+        day = temp_db.get_rollups(hours=24 * 30, resolution="day")
+        assert len(day) == 1
+        assert day[0]["healthy_count"] == 2
+        assert day[0]["unhealthy_count"] == 1
+        assert day[0]["missing_count"] == 1
+        assert day[0]["total_count"] == 4
+        assert day[0]["response_time_min"] == 10
+        assert day[0]["response_time_max"] == 30
+        assert abs(day[0]["response_time_avg"] - 20.0) < 0.01
+        assert day[0]["response_time_p95"] == 30
+        assert len(temp_db.get_rollups(hours=24 * 30, resolution="minute")) == 1
+
+    def test_compact_keeps_recent_rows(self, temp_db):
+        temp_db.record_check("postiz", "healthy", 5)
+
+        assert temp_db.compact(retention_days=7) == 0
+        assert len(temp_db.get_history(hours=1)) == 1
+
+    def test_compact_is_idempotent(self, temp_db):
+        _insert_old_checks(temp_db.db_path, [("postiz", "healthy", 10, _days_ago(10))])
+
+        temp_db.compact(retention_days=7)
+        temp_db.compact(retention_days=7)
+
+        day = temp_db.get_rollups(hours=24 * 30, resolution="day")
+        assert day[0]["total_count"] == 1
+
+    def test_uptime_includes_compacted_history(self, temp_db):
+        _insert_old_checks(temp_db.db_path, [
+            ("postiz", "healthy", 10, _days_ago(10)),
+            ("postiz", "unhealthy", 10, _days_ago(10)),
+        ])
+        temp_db.compact(retention_days=7)
+        temp_db.record_check("postiz", "healthy", 10)
+        temp_db.record_check("postiz", "healthy", 10)
+
+        stats = temp_db.get_uptime_stats(days=30)
+
+        assert abs(stats["postiz"] - 75.0) < 0.01
+
+    def test_coarsest_resolution_for_window(self, temp_db):
+        assert temp_db._select_resolution(24 * 7) == "day"
+        assert temp_db._select_resolution(6) == "hour"
+        assert temp_db._select_resolution(0.5) == "minute"
+
+
+class TestUptimeBuckets:
+    def test_counters_updated_on_insert(self, temp_db):
+        import sqlite3
+
+        temp_db.record_check("postiz", "healthy", 10)
+        temp_db.record_sweep([("postiz", "unhealthy", 10, None)], [])
+
+        with sqlite3.connect(temp_db.db_path) as conn:
+            rows = conn.execute(
+                "SELECT healthy_count, total_count FROM uptime_buckets WHERE service_name = 'postiz'"
+            ).fetchall()
+        assert rows == [(1, 2)]
+
+    def test_uptime_survives_compaction(self, temp_db):
+        _insert_old_checks(temp_db.db_path, [
+            ("postiz", "healthy", 10, _days_ago(10)),
+            ("postiz", "unhealthy", 10, _days_ago(10)),
+        ])
+        temp_db.compact(retention_days=7)
+
+        stats = temp_db.get_uptime_stats(days=30)
+
+        assert abs(stats["postiz"] - 50.0) < 0.01
+
+    def test_compact_prunes_expired_buckets(self, temp_db):
+        import sqlite3
+
+        from health_storage import UPTIME_RETENTION_DAYS
+
+        with sqlite3.connect(temp_db.db_path) as conn:
+            conn.execute(
+                "INSERT INTO uptime_buckets VALUES ('postiz', datetime('now', ?), 1, 1)",
+                (f"-{UPTIME_RETENTION_DAYS + 1} days",),
+            )
+        temp_db.record_check("postiz", "healthy", 10)
+
+        temp_db.compact()
+
+        with sqlite3.connect(temp_db.db_path) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM uptime_buckets").fetchone()[0]
+        assert count == 1
+
+    def test_window_excludes_old_buckets(self, temp_db):
+        _insert_old_checks(temp_db.db_path, [("postiz", "unhealthy", 10, _days_ago(10))])
+        temp_db.record_check("postiz", "healthy", 10)
+
+        stats = temp_db.get_uptime_stats(days=7)
+
+        assert abs(stats["postiz"] - 100.0) < 0.01
+
+    def test_existing_database_backfilled(self, tmp_path):
+        import sqlite3
+
+        from health_storage import HealthStorage
+
+        db_path = tmp_path / "legacy.sqlite"
+        with sqlite3.connect(db_path) as conn:
+            conn.executescript(
+                """
+                CREATE TABLE health_checks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    service_name TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    response_time_ms INTEGER,
+                    details TEXT,
+                    checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                INSERT INTO health_checks (service_name, status) VALUES ('postiz', 'healthy');
+                INSERT INTO health_checks (service_name, status) VALUES ('postiz', 'unhealthy');
+                """
+            )
+        conn.close()
+
+        with HealthStorage(db_path) as storage:
+            stats = storage.get_uptime_stats(days=1)
+
+        assert abs(stats["postiz"] - 50.0) < 0.01
+
+
+class TestMigrations:
+    def test_new_database_at_current_version(self, temp_db):
+        import sqlite3
+
+        from health_storage import SCHEMA_VERSION
+
+        with sqlite3.connect(temp_db.db_path) as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        assert version == SCHEMA_VERSION
+
+    def test_legacy_database_upgraded_in_place(self, tmp_path):
+        import sqlite3
+
+        from health_storage import SCHEMA_VERSION, HealthStorage
+
+        db_path = tmp_path / "legacy.sqlite"
+        with sqlite3.connect(db_path) as conn:
+            conn.executescript(
+                """
+                CREATE TABLE health_checks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    service_name TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    response_time_ms INTEGER,
+                    details TEXT,
+                    checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                INSERT INTO health_checks (service_name, status) VALUES ('postiz', 'healthy');
+                """
+            )
+        conn.close()
+
+        with HealthStorage(db_path) as storage:
+            assert storage.get_last_status("postiz") == "healthy"
+            assert len(storage.get_history(hours=1)) == 1
+
+        with sqlite3.connect(db_path) as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        conn.close()
+        assert version == SCHEMA_VERSION
+        assert "idx_health_time_covering" in indexes
+
+    def test_history_across_services_seeks_by_time(self, temp_db):
+        import sqlite3
+
+        with sqlite3.connect(temp_db.db_path) as conn:
+            plan = conn.execute(
+                """EXPLAIN QUERY PLAN
+                   SELECT service_name, status FROM health_checks
+                   WHERE checked_at >= datetime('now', '-1 hours')
+                   ORDER BY checked_at DESC"""
+            ).fetchall()
+        detail = " ".join(row[-1] for row in plan)
+        assert "idx_health_time_covering" in detail
+
+    def test_uptime_seeks_by_time(self, temp_db):
+        import sqlite3
+
+        from health_storage import _UPTIME_QUERY
+
+        with sqlite3.connect(temp_db.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO uptime_buckets VALUES (?, datetime('now', ?), 1, 1)",
+                [(f"svc-{i % 20}", f"-{i} hours") for i in range(2000)],
+            )
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {_UPTIME_QUERY}", ("-7 days",)).fetchall()
+        detail = " ".join(row[-1] for row in plan)
+        assert "idx_uptime_time_covering" in detail
+        assert "SCAN uptime_buckets" not in detail
+
+
+class TestHistoryPagination:
+    def test_pages_cover_all_rows_without_overlap(self, temp_db):
+        temp_db.record_sweep([("postiz", "healthy", i, None) for i in range(7)], [])
+
+        first, cursor = temp_db.get_history_page(hours=1, limit=3, columns=("id",))
+        second, cursor = temp_db.get_history_page(hours=1, limit=3, columns=("id",), cursor=cursor)
+        third, cursor = temp_db.get_history_page(hours=1, limit=3, columns=("id",), cursor=cursor)
+
+        ids = [r["id"] for r in first + second + third]
+        assert ids == sorted(ids, reverse=True)
+        assert len(set(ids)) == 7
+        assert cursor is None
+
+    def test_iter_history_streams_every_row(self, temp_db):
+        temp_db.record_sweep([("postiz", "healthy", i, None) for i in range(5)], [])
+        temp_db.record_check("redis", "unhealthy", 1)
+
+        rows = list(temp_db.iter_history(hours=1, service_name="postiz", page_size=2))
+
+        assert len(rows) == 5
+        assert all(r["service_name"] == "postiz" for r in rows)
+
+    def test_projection_and_details_decoding(self, temp_db):
+        temp_db.record_check("postiz", "unhealthy", 10, {"error": "down"})
+
+        raw = next(temp_db.iter_history(hours=1, columns=("status", "details")))
+        decoded = next(temp_db.iter_history(hours=1, columns=("details",), decode_details=True))
+
+        assert raw == {"status": "unhealthy", "details": '{"error": "down"}'}
+        assert decoded == {"details": {"error": "down"}}
+
+    def test_unknown_column_rejected(self, temp_db):
+        import pytest
+
+        with pytest.raises(ValueError):
+            temp_db.get_history_page(columns=("status; DROP TABLE health_checks",))
+
+
+class TestFailureStreaks:
+    def test_counts_checks_since_last_healthy(self, temp_db):
+        temp_db.record_sweep(
+            [
+                ("postiz", "unhealthy", 1, None),
+                ("postiz", "healthy", 1, None),
+                ("postiz", "unhealthy", 1, None),
+                ("postiz", "missing", 1, None),
+                ("redis", "healthy", 1, None),
+            ],
+            [],
+        )
+
+        assert temp_db.get_failure_streaks() == {"postiz": 2, "redis": 0}
+
+    def test_never_healthy_counts_every_check(self, temp_db):
+        for _ in range(3):
+            temp_db.record_check("temporal", "unhealthy", 1)
+
+        assert temp_db.get_failure_streaks() == {"temporal": 3}
+
+    def test_empty_database(self, temp_db):
+        assert temp_db.get_failure_streaks() == {}